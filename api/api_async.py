@@ -3,6 +3,7 @@ import aiohttp
 from typing import Dict
 from json import loads as json_parse
 import asyncio
+from decouple import config
 
 
 def run_async(method):
@@ -57,6 +58,74 @@ class Response:
         return self.__raw
 
 
+class SessionManager:
+    """Process-wide pooled aiohttp session; keeps connections alive per host and caches dns lookups,
+    so that api polls do not pay for a new tcp/tls handshake each time."""
+
+    _session: aiohttp.ClientSession | None = None
+    limitPerHost: int = int(config("HTTP_LIMIT_PER_HOST", 8))
+    totalLimit: int = int(config("HTTP_TOTAL_LIMIT", 64))
+    dnsCacheTTL: int = int(config("HTTP_DNS_CACHE_TTL", 600))
+    keepAliveTimeout: float = float(config("HTTP_KEEPALIVE_TIMEOUT", 60))
+
+    # statistics
+    newConnections: int = 0
+    reusedConnections: int = 0
+    requestsCount: int = 0
+
+    @staticmethod
+    async def _on_connection_create_end(_session, _ctx, _params):
+        SessionManager.newConnections += 1
+
+    @staticmethod
+    async def _on_connection_reuseconn(_session, _ctx, _params):
+        SessionManager.reusedConnections += 1
+
+    @staticmethod
+    async def _on_request_start(_session, _ctx, _params):
+        SessionManager.requestsCount += 1
+
+    @staticmethod
+    def session() -> aiohttp.ClientSession:
+        """Returns the shared session; creates it lazily on the running event loop."""
+        if SessionManager._session is None or SessionManager._session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(SessionManager._on_connection_create_end)
+            trace.on_connection_reuseconn.append(SessionManager._on_connection_reuseconn)
+            trace.on_request_start.append(SessionManager._on_request_start)
+            connector = aiohttp.TCPConnector(
+                limit=SessionManager.totalLimit,
+                limit_per_host=SessionManager.limitPerHost,
+                ttl_dns_cache=SessionManager.dnsCacheTTL,
+                use_dns_cache=True,
+                keepalive_timeout=SessionManager.keepAliveTimeout,
+            )
+            SessionManager._session = aiohttp.ClientSession(
+                connector=connector, trust_env=True, trace_configs=[trace]
+            )
+        return SessionManager._session
+
+    @staticmethod
+    async def start(*_):
+        SessionManager.session()
+
+    @staticmethod
+    async def close(*_):
+        if SessionManager._session is not None and not SessionManager._session.closed:
+            await SessionManager._session.close()
+        SessionManager._session = None
+
+    @staticmethod
+    def report() -> str:
+        total = SessionManager.newConnections + SessionManager.reusedConnections
+        ratio = SessionManager.reusedConnections / total * 100 if total else 0.0
+        return (
+            f"HTTP Requests: {SessionManager.requestsCount}\n"
+            f"New Connections: {SessionManager.newConnections}\n"
+            f"Reused Connections: {SessionManager.reusedConnections} ({ratio:.1f}%)"
+        )
+
+
 class Request:
 
     def __init__(
@@ -66,9 +135,11 @@ class Request:
         headers: dict = None,
         method: RequestMethod = RequestMethod.Get,
         timeout: float = 5.0,
+        params: dict = None,
     ) -> None:
         self.__url = url
         self.__payload = payload
+        self.__params = params  # query string parameters
         self.__method = method
         self.__headers = headers
         if not self.__headers and (
@@ -104,16 +175,18 @@ class Request:
         return self
 
     async def get(self):
-        async with aiohttp.ClientSession(trust_env=True, headers=self.__headers, timeout=self.__timeout) as session:
-            async with session.get(self.__url) as response:
-                r = await Response(response).read()
-                return r
+        session = SessionManager.session()
+        async with session.get(
+            self.__url, params=self.__params, headers=self.__headers, timeout=self.__timeout
+        ) as response:
+            return await Response(response).read()
 
     async def post(self):
-        async with aiohttp.ClientSession(trust_env=True, headers=self.__headers, timeout=self.__timeout) as session:
-            async with session.post(self.__url, json=self.__payload) as response:
-                r = await Response(response).read()
-                return r
+        session = SessionManager.session()
+        async with session.post(
+            self.__url, json=self.__payload, headers=self.__headers, timeout=self.__timeout
+        ) as response:
+            return await Response(response).read()
 
     async def do(self):
         match self.__method:
@@ -1,8 +1,10 @@
 import json
+import asyncio
+from time import time
 from tools import mathematix, manuwriter
-from tools.exceptions import CacheFailureException
+from api.cache_writer import CacheWriter
 import api.api_async as api
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 
 
 class BaseAPIService:
@@ -22,25 +24,17 @@ class BaseAPIService:
         self.timeout: int = timeout
         self.params: dict = params or dict()
         self.cache_file_name: str = cache_file_name
-        self.cache_folder_created: bool = False
         self.latest_data = (
             dict()
         )  # Latest loaded cache/API data; This is a helper object for preventing unnecessary Api Call or Cache file read
         # Causing: App enhancement, less APi Calls(For best management of non-free API uses), Less cache file read for improving bot performance and speed and prevention of lags
 
-    def cache_data(self, data: str, custom_file_name: str = None) -> None:
-        if not self.cache_folder_created:
-            try:
-                self.cache_folder_created = manuwriter.prepare_folder(BaseAPIService.cacheFolderPath)
-            except OSError as e:
-                manuwriter.log("api-cache folder creation failed!", e, "cache")
-                raise CacheFailureException("Cache Folder creation failed!")
-        try:
-            filename = self.cache_file_name if not custom_file_name else custom_file_name
-            manuwriter.fwrite_from_scratch(f"./{BaseAPIService.cacheFolderPath}/{filename}", data, self.Source)
-        except Exception as ex:
-            manuwriter.log("Caching failure!", ex, category_name="CACHING")
-            raise CacheFailureException(ex)
+    def cache_data(self, data: str | dict | list, custom_file_name: str = None) -> None:
+        """Queue the data to be written into the cache file by the cache writer thread; data other than strings is
+        serialized there too, so it must not be modified after this call."""
+        CacheWriter.get().schedule(
+            BaseAPIService.cacheFolderPath, custom_file_name or self.cache_file_name, data, self.Source
+        )
 
     async def get_request(self, headers: dict = None, no_cache: bool = True):
         request = api.Request(self.URL, headers=headers, payload=self.params)
@@ -77,18 +71,53 @@ class APIService(BaseAPIService):
     usdInTomans = None
     tetherInTomans = None
     previousTetherInTomans = None
+    # bumped whenever the usd/tether prices change, since every rendered price row in tomans depends on them
+    unitPricesVersion: int = 0
+    # bumped whenever any of the symbol name tables (persian names, shortcuts, ...) is loaded or changed
+    symbolNamesVersion: int = 0
+
+    # an update finished less than this many seconds ago is reused instead of calling the api again
+    singleFlightReuseWindow: float = 5.0
 
     def __init__(self, url: str, source: str, params=None, cache_file_name: str = None) -> None:
         super(APIService, self).__init__(url, source, params=params, cache_file_name=cache_file_name)
+        self.inflight_update: asyncio.Future | None = None
+        self.last_update_time: float = 0.0
+        self.last_update_result = None
+        # single-flight statistics
+        self.update_fetches: int = 0
+        self.update_waits: int = 0
+        self.update_hits: int = 0
+        # called with the service after each successful update, even one which finishes after its caller's deadline
+        self.update_listeners: List[Callable[["APIService"], None]] = []
+        # price rows rendered from the current snapshot of latest_data; dropped as soon as a new snapshot is published
+        self.snapshot_version: int = 0
+        self.rendered_rows: Dict[Tuple[str, str, str | None], str] = {}
+        self.rendered_rows_version: Tuple[int, int] | None = None
+        self.row_hits: int = 0
+        self.row_renders: int = 0
+        self.conversion_prices: Dict[str, float] = {}
+        self.conversion_prices_version: Tuple[int, int] | None = None
 
     @staticmethod
     def set_usd_price(value):
-        APIService.usdInTomans = float(value)
+        value = float(value)
+        if value != APIService.usdInTomans:
+            APIService.usdInTomans = value
+            APIService.unitPricesVersion += 1
 
     @staticmethod
     def set_tether_tomans(value):
+        previous_state = (APIService.tetherInTomans, APIService.previousTetherInTomans)
         APIService.previousTetherInTomans = APIService.tetherInTomans if APIService.previousTetherInTomans is not None else float(value)
         APIService.tetherInTomans = float(value)
+        if previous_state != (APIService.tetherInTomans, APIService.previousTetherInTomans):
+            APIService.unitPricesVersion += 1
+
+    def publish_snapshot(self):
+        """Call after latest_data/pre_latest_data are replaced or modified; latest_data must not be changed afterwards
+        until the next call, since rendered rows are reused until then."""
+        self.snapshot_version += 1
 
     def get_desired_ones(self, desired_ones: List[str]) -> list:
         pass
@@ -98,10 +127,50 @@ class APIService(BaseAPIService):
     ) -> Tuple[str, str]:
         pass
 
+    async def update(self):
+        self.latest_data = await self.get_request()  # update latest
+        return True
+
+    async def update_once(self):
+        """Single-flight version of update(): concurrent callers share the one in-flight api call and its result,
+        and an update that has just finished is reused as is."""
+        if self.inflight_update is not None and not self.inflight_update.done():
+            self.update_waits += 1
+            return await asyncio.shield(self.inflight_update)
+        if self.last_update_time and time() - self.last_update_time < APIService.singleFlightReuseWindow:
+            self.update_hits += 1
+            return self.last_update_result
+
+        self.update_fetches += 1
+        self.inflight_update = asyncio.ensure_future(self.update())
+        self.inflight_update.add_done_callback(self.on_update_finished)
+        # shielded, so that a caller being cancelled (by a deadline for instance) does not cancel the others' shared call
+        return await asyncio.shield(self.inflight_update)
+
+    def on_update_finished(self, update_task: asyncio.Future):
+        if update_task.cancelled() or update_task.exception():
+            return
+        self.last_update_result = update_task.result()
+        self.last_update_time = time()
+        if not self.last_update_result:
+            return
+        for listener in self.update_listeners:
+            try:
+                listener(self)
+            except Exception as ex:
+                manuwriter.log(f"{self.Source} update listener failed.", ex, category_name=self.Source)
+
+    @property
+    def single_flight_report(self) -> str:
+        return (
+            f"{self.Source} Updates: Fetches={self.update_fetches}, Waits={self.update_waits}, "
+            f"Hits={self.update_hits}, Saved={self.update_waits + self.update_hits}"
+        )
+
     async def get(
         self, desired_ones: List[str] = None, language: str = "fa", no_price_message: str | None = None
     ) -> Tuple[str, str]:
-        self.latest_data = await self.get_request()  # update latest
+        await self.update_once()
         return self.extract_api_response(desired_ones, language, no_price_message)
 
     def get_latest(
@@ -150,6 +219,44 @@ class APIService(BaseAPIService):
 
         return mathematix.cut_and_separate(price), None
 
+    def get_price_description_row(
+        self, symbol: str, language: str = "fa", no_price_message: str | None = None
+    ) -> str:
+        version = (self.snapshot_version, APIService.unitPricesVersion)
+        if version != self.rendered_rows_version:
+            self.rendered_rows = {}
+            self.rendered_rows_version = version
+        key = (symbol, language, no_price_message)
+        if (row := self.rendered_rows.get(key)) is not None:
+            self.row_hits += 1
+            return row
+        self.row_renders += 1
+        row = self.rendered_rows[key] = self.render_price_description_row(symbol, language, no_price_message)
+        return row
+
+    def render_price_description_row(
+        self, symbol: str, language: str = "fa", no_price_message: str | None = None
+    ) -> str:
+        pass
+
+    def conversion_vector(self) -> Dict[str, float]:
+        """Price of every symbol in the unit the service equalizes amounts with, parsed once per snapshot."""
+        version = (self.snapshot_version, APIService.unitPricesVersion)
+        if version != self.conversion_prices_version:
+            self.conversion_prices = self.build_conversion_vector()
+            self.conversion_prices_version = version
+        return self.conversion_prices
+
+    def build_conversion_vector(self) -> Dict[str, float]:
+        return {}
+
+    @property
+    def rows_report(self) -> str:
+        return (
+            f"{self.Source} Price Rows: Snapshot={self.snapshot_version}, Cached={len(self.rendered_rows)}, "
+            f"Hits={self.row_hits}, Renders={self.row_renders}"
+        )
+
     @staticmethod
     def getTokenState(current_price: float | int, previous_price: float | int) -> str:
         return "🟢" if current_price > previous_price else ("🔴" if current_price < previous_price else "⚪️")
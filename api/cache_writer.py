@@ -0,0 +1,111 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Tuple
+import json
+from tools import manuwriter
+
+
+class CacheWriter:
+    """Writes the api cache files on a worker thread, so serializing & writing them never blocks the event loop.
+    Files are replaced atomically, and a write requested while an older one for the same file is still waiting,
+    just replaces its data, so back-to-back updates are written once."""
+
+    _instance = None
+
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-writer")
+        self.lock = Lock()
+        self.pending: Dict[str, Tuple[str, Any]] = {}  # file path => (source, data)
+        self.futures: Dict[str, Future] = {}
+        self.prepared_folders: set = set()
+        self.closed: bool = False
+
+        # per source statistics
+        self.stats: Dict[str, Dict[str, int | float]] = {}
+
+    @staticmethod
+    def get():
+        if not CacheWriter._instance:
+            CacheWriter._instance = CacheWriter()
+        return CacheWriter._instance
+
+    def source_stats(self, source: str) -> Dict[str, int | float]:
+        if not (stats := self.stats.get(source)):
+            stats = self.stats[source] = {
+                "writes": 0,
+                "coalesced": 0,
+                "failures": 0,
+                "bytes": 0,
+                "total_latency": 0.0,
+                "last_latency": 0.0,
+            }
+        return stats
+
+    def schedule(self, folder: str, filename: str, data: str | Any, source: str) -> bool:
+        """Queue data to be written into the file; non-string data is json serialized on the worker.
+        Returns False if the writer is already shut down."""
+        path = f"./{folder}/{filename}"
+        with self.lock:
+            if self.closed:
+                manuwriter.log(f"Cache write of {path} requested after shutdown; ignored.", category_name="CACHING")
+                return False
+            if path in self.pending:
+                self.source_stats(source)["coalesced"] += 1
+            self.pending[path] = (source, data)
+            if path not in self.futures:
+                self.futures[path] = self.executor.submit(self.write, folder, path)
+        return True
+
+    def submit(self, task: Callable, *args) -> Future | None:
+        """Run a custom write task (such as a binary snapshot) on the writer thread, in order with the cache writes.
+        Returns None if the writer is already shut down."""
+        with self.lock:
+            if self.closed:
+                manuwriter.log("Write task submitted after shutdown; ignored.", category_name="CACHING")
+                return None
+            return self.executor.submit(task, *args)
+
+    def write(self, folder: str, path: str):
+        with self.lock:
+            del self.futures[path]
+            source, data = self.pending.pop(path)
+        started_at = perf_counter()
+        try:
+            if folder not in self.prepared_folders and manuwriter.prepare_folder(folder):
+                self.prepared_folders.add(folder)
+            if not isinstance(data, str):
+                data = json.dumps(data)
+            written = manuwriter.fwrite_from_scratch(path, data, source)
+        except Exception as ex:
+            manuwriter.log("Caching failure!", ex, category_name="CACHING")
+            written = False
+
+        latency = perf_counter() - started_at
+        with self.lock:
+            stats = self.source_stats(source)
+            if written:
+                stats["writes"] += 1
+                stats["bytes"] += len(data.encode())
+                stats["total_latency"] += latency
+                stats["last_latency"] = latency
+            else:
+                stats["failures"] += 1
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=True)  # pending writes are done first
+
+    @property
+    def report(self) -> str:
+        rows = []
+        with self.lock:
+            for source, stats in self.stats.items():
+                average_latency = stats["total_latency"] / stats["writes"] if stats["writes"] else 0.0
+                rows.append(
+                    f"{source} Cache Writes: {stats['writes']}, Coalesced={stats['coalesced']}, "
+                    f"Failures={stats['failures']}, Bytes={stats['bytes']}\n"
+                    f"Avg Latency={average_latency * 1000:.1f}ms, Last Latency={stats['last_latency'] * 1000:.1f}ms"
+                )
+        return "\n".join(rows) or "No cache writes yet."
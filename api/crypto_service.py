@@ -1,5 +1,5 @@
-import coinmarketcapapi as cmc_api
 from api.base import *
+from time import time
 from api.key_manager import ApiKeyManager
 from tools.exceptions import NoLatestDataException, InvalidInputException
 from typing import List, Tuple
@@ -17,8 +17,10 @@ class CryptoCurrencyService(APIService):
         super().__init__(url, source, params, cache_file_name)
         if not CryptoCurrencyService.coinsInPersian:
             CryptoCurrencyService.coinsInPersian = CryptoCurrencyService.loadPersianNames()
+            APIService.symbolNamesVersion += 1
         if not CryptoCurrencyService.persianShortcuts:
             CryptoCurrencyService.persianShortcuts = CryptoCurrencyService.loadPersianShortcuts()
+            APIService.symbolNamesVersion += 1
 
     @staticmethod
     def getDefaultCryptos():
@@ -66,7 +68,9 @@ class CoinGeckoService(CryptoCurrencyService):
             url="https://api.coingecko.com/api/v3/coins/list", source="CoinGecko.com", cache_file_name="coingecko.json"
         )
 
-    def get_price_description_row(self, symbol: str, language: str = "fa", no_price_message: str | None = None) -> str:
+    def render_price_description_row(
+        self, symbol: str, language: str = "fa", no_price_message: str | None = None
+    ) -> str:
         pass
 
     def extract_api_response(
@@ -87,73 +91,121 @@ class CoinGeckoService(CryptoCurrencyService):
 class CoinMarketCapService(CryptoCurrencyService):
     """CoinMarketCap Class. The object of this class will get the cryptocurrency prices from CoinMarketCap."""
 
+    # CMC status codes that mean the current key is unusable (invalid, out of credits, or rate limited)
+    keyRejectionStatusCodes = (401, 402, 403, 429)
+
     def __init__(self, api_key, price_unit="USD", cmc_coin_fetch_limit: int = 500, params=None) -> None:
         super(CoinMarketCapService, self).__init__(
-            url="https://sandbox-api.coinmarketcap.com/v1/cryptocurrency/listings/latest",
+            url="https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest",
             source="CoinMarketCap",
             cache_file_name="coinmarketcap.json",
         )
+        self.headers = {"Accept": "application/json", "X-CMC_PRO_API_KEY": api_key}
         self.keyman = ApiKeyManager(api_key, self.update_cmc_api, keystore_filename="cmc_keys")
         self.price_unit: str = price_unit
-        self.cmc_api = cmc_api.CoinMarketCapAPI(self.keyman.api_key)
+        self.update_cmc_api(self.keyman.api_key)
         self.cmc_coin_fetch_limit = cmc_coin_fetch_limit
         self.pre_latest_data: dict | None = None
+        # per call statistics
+        self.last_call_latency: float | None = None
+        self.last_call_credits: int | None = None
+        self.total_calls: int = 0
+        self.total_credits: int = 0
+        self.total_latency: float = 0.0
 
     def update_cmc_api(self, api_key: str):
-        self.cmc_api = cmc_api.CoinMarketCapAPI(api_key)
+        self.headers["X-CMC_PRO_API_KEY"] = api_key
 
     def set_price_unit(self, pu):
         self.price_unit = pu
 
-    def raw_data_to_price_dict(self, source_list: list, key_as: str = "symbol"):
+    def raw_data_to_price_dict(self, source_list: list, key_as: str = "symbol", price_unit: str | None = None):
         result = {}
+        price_unit = price_unit or self.price_unit
 
         for item in source_list:
             symbol = item[key_as].upper()
             if (
                 symbol not in result
             ):  # since there are some tokens with the same symbol; One main impact of not checking this the invalid price for btc!
-                result[symbol] = item["quote"][self.price_unit]
+                result[symbol] = item["quote"][price_unit]
 
         return result
 
     async def get_request(self, _headers: dict = None, no_cache: bool = True):
         """Send request to coinmarketcap to receive the prices. This function differs from other .get_request methods from other BaseAPIService children"""
-        latest_cap = self.cmc_api.cryptocurrency_listings_latest(limit=self.cmc_coin_fetch_limit)
-        if not latest_cap or not latest_cap.data:
+        start_time = time()
+        # limit & convert are sent per call, so that they always match the current price unit & fetch limit
+        price_unit = self.price_unit
+        response = await api.Request(
+            self.URL,
+            headers=self.headers,
+            timeout=self.timeout,
+            params={"limit": self.cmc_coin_fetch_limit, "convert": price_unit},
+        ).get()
+        self.last_call_latency = time() - start_time
+        self.total_calls += 1
+        self.total_latency += self.last_call_latency
+
+        status = response.data.get("status", {}) if isinstance(response.data, dict) else {}
+        self.last_call_credits = status.get("credit_count", 0) or 0
+        self.total_credits += self.last_call_credits
+
+        if not response.OK:
+            if response.status in CoinMarketCapService.keyRejectionStatusCodes:
+                self.keyman.use_next()
+            raise Exception(
+                f"CoinMarketCap API Error: Status Code: {response.status}, Message: {status.get('error_message') or response.text}"
+            )
+        if not response.data.get("data"):
             raise Exception("CoinMarketCap API Error: Missing data")
-        result = self.raw_data_to_price_dict(latest_cap.data)
+        result = self.raw_data_to_price_dict(response.data["data"], price_unit=price_unit)
         if not no_cache:
-            self.cache_data(json.dumps(result))
+            self.cache_data(result)
         return result
 
-    async def update(self):
+    async def update(self) -> bool:
+        """Returns False if the newest prices could not be obtained; the previous snapshot is kept in that case."""
         try:
             new_data = await self.get_request()  # update latest
             self.pre_latest_data = self.latest_data  # only update pre_latest when api call was ok
             self.latest_data = new_data
+            self.publish_snapshot()
             self.keyman.ok()
         except Exception as x:
             manuwriter.log("Failed obtaining newest Cryptocurrency prices", x, category_name="CoinMarketCap")
             self.keyman.fail()
+            return False
 
         try:
             if self.latest_data and isinstance(self.latest_data, dict):
-                self.cache_data(json.dumps(self.latest_data))
+                self.cache_data(self.latest_data)
         except:
             pass
+        return True
+
+    @property
+    def report(self) -> str:
+        average_latency = self.total_latency / self.total_calls if self.total_calls else 0.0
+        last_latency = f"{self.last_call_latency:.2f}s" if self.last_call_latency is not None else "-"
+        return (
+            f"{self.Source} Calls: {self.total_calls}\n"
+            f"Last Call: {last_latency}, {self.last_call_credits or 0} credits\n"
+            f"Average Latency: {average_latency:.2f}s\nTotal Credits Used: {self.total_credits}"
+        )
 
     def load_cache(self) -> dict:
         try:
             self.latest_data = super(CoinMarketCapService, self).load_cache()
         except:
             self.latest_data = {}
+        self.publish_snapshot()
         return self.latest_data
 
     async def get(
         self, desired_ones: List[str] = None, language: str = "fa", no_price_message: str | None = None
     ) -> Tuple[str, str]:
-        await self.update()
+        await self.update_once()
         return self.extract_api_response(desired_ones, language, no_price_message)
 
     def extract_api_response(
@@ -177,15 +229,14 @@ class CoinMarketCapService(CryptoCurrencyService):
         language: str = "fa",
     ) -> str:
         cryptos = self.get_desired_ones(cryptos)
+        prices = self.conversion_vector()
         res: str = ""
         coin_equalized_price: str
         for coin in cryptos:
             if coin == source_unit_symbol:
                 continue
             try:
-                coin_equalized_price = mathematix.cut_and_separate(
-                    absolute_amount / float(self.latest_data[coin]["price"])
-                )
+                coin_equalized_price = mathematix.cut_and_separate(absolute_amount / prices[coin])
             except Exception as x:
                 manuwriter.log("No Price Data:", x, "CoinMarketCap")
                 coin_equalized_price = "?"
@@ -233,6 +284,17 @@ class CoinMarketCapService(CryptoCurrencyService):
             ),
         )
 
+    def build_conversion_vector(self) -> Dict[str, float]:
+        """Usd price of every coin."""
+        prices = {}
+        if isinstance(self.latest_data, dict):
+            for coin, data in self.latest_data.items():
+                try:
+                    prices[coin] = float(data["price"])
+                except (KeyError, TypeError, ValueError):
+                    pass
+        return prices
+
     def get_single_price(self, crypto_symbol: str, price_unit: str = "usd", tether_instead_of_dollars: bool = True):
         if not isinstance(self.latest_data, dict):
             return None
@@ -251,7 +313,9 @@ class CoinMarketCapService(CryptoCurrencyService):
 
         return self.to_irt_exact(data["price"], tether_instead_of_dollars) if price_unit == "irt" else data["price"]
 
-    def get_price_description_row(self, symbol: str, language: str = "fa", no_price_message: str | None = None) -> str:
+    def render_price_description_row(
+        self, symbol: str, language: str = "fa", no_price_message: str | None = None
+    ) -> str:
         try:
             if symbol not in self.latest_data:
                 raise ValueError(f"{symbol} not found in CoinMarketCap response data!")
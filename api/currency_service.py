@@ -255,6 +255,7 @@ class NavasanService(CurrencyService):
                 GoldService.goldsInEnglish, **NavasanService.goldsInEnglish
             )
         NavasanService.persianShortcuts = get_currency_persian_shortcuts()
+        APIService.symbolNamesVersion += 1
         NavasanService.majorPriceUnits = {
             "irt": {
                 "fa": NavasanService.currenciesInPersian["IRT"],
@@ -297,12 +298,22 @@ class NavasanService(CurrencyService):
         return res_curr, res_gold
 
     # --------- Currency -----------
+    async def fetch_tether_price(self):
+        """Fetch USDT-IRT price from the selected tether source; the alternate source is called only when the main one is not responding."""
+        if not self.tether_service or self.tether_toman_source == TomanUsdtSources.NAVASAN:
+            return
+        await self.tether_service.get()
+        if (
+            self.tether_service.recent_value and self.tether_service.no_response_counts < 3
+        ) or not self.alternate_tether_service:
+            return
+        await self.alternate_tether_service.get()
+
     async def get_request(self, _: dict = None, __: bool = False):
-        response = await super(NavasanService, self).get_request()
-        if self.tether_service and (
-            self.tether_toman_source != TomanUsdtSources.NAVASAN
-        ):
-            await self.tether_service.get()
+        # tether sources are requested alongside navasan, so the total wait is the slowest one, not the sum of them.
+        response, _ = await asyncio.gather(
+            super(NavasanService, self).get_request(), self.fetch_tether_price()
+        )
         return response
 
     async def select_best_tether_price(self):
@@ -326,9 +337,9 @@ class NavasanService(CurrencyService):
                 APIService.set_tether_tomans(self.tether_service.recent_value)
                 return
 
-            await self.alternate_tether_service.get()
             if (
-                self.alternate_tether_service.recent_value
+                self.alternate_tether_service
+                and self.alternate_tether_service.recent_value
                 and self.alternate_tether_service.no_response_counts < 3
             ):
                 APIService.set_tether_tomans(self.alternate_tether_service.recent_value)
@@ -372,8 +383,9 @@ class NavasanService(CurrencyService):
             "value": 1 / APIService.usdInTomans
         }
 
+        self.publish_snapshot()
         try:
-            self.cache_data(json.dumps(self.latest_data))
+            self.cache_data(self.latest_data)
         except:
             pass
 
@@ -390,6 +402,7 @@ class NavasanService(CurrencyService):
             APIService.set_usd_price(price)
             try:
                 self.latest_data["usd"]["value"] = NavasanService.manualDollarPrice
+                self.publish_snapshot()
             except:
                 pass
 
@@ -399,7 +412,7 @@ class NavasanService(CurrencyService):
         language: str = "fa",
         no_price_message: str | None = None,
     ) -> Tuple[str, str]:
-        if not (await self.update()):
+        if not (await self.update_once()):
             return "", ""
         return self.extract_api_response(desired_ones, language, no_price_message)
 
@@ -408,6 +421,7 @@ class NavasanService(CurrencyService):
             self.latest_data = super(NavasanService, self).load_cache()
         except:
             self.latest_data = {}
+        self.publish_snapshot()
         return self.latest_data
 
     def irt_to_usd(self, irt_price: float | int) -> float | int:
@@ -422,6 +436,7 @@ class NavasanService(CurrencyService):
         absolute_usd: float | int = None,
     ) -> Tuple[str, str]:
         currencies = self.get_desired_ones(currencies)
+        prices = self.conversion_vector()
         res_gold, res_fiat = "", ""
         for target_slug in currencies:
             if target_slug == source_unit_slug:
@@ -434,10 +449,7 @@ class NavasanService(CurrencyService):
                     if absolute_usd is not None
                     and target_slug == self.dollarSymbol
                     and source_unit_slug == self.tetherSymbol
-                    else absolute_irt
-                    / self.get_single_price(
-                        target_slug, "irt", data_check_required=False
-                    )
+                    else absolute_irt / prices[target_slug]
                 )
             )
 
@@ -492,6 +504,22 @@ class NavasanService(CurrencyService):
             absolute_amount,
         )
 
+    def build_conversion_vector(self) -> Dict[str, float]:
+        """Toman price of every symbol; the same as what get_single_price(symbol, "irt") returns."""
+        prices = {}
+        if isinstance(self.latest_data, dict):
+            for slug, currency_data in self.latest_data.items():
+                try:
+                    price = float(currency_data["value"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                prices[slug.upper()] = (
+                    price if "usd" not in currency_data or not currency_data["usd"] else self.to_irt_exact(price)
+                )
+        prices[self.dollarSymbol] = APIService.usdInTomans
+        prices[self.tomanSymbol] = 1
+        return prices
+
     def get_single_price(
         self,
         currency_symbol: str,
@@ -560,7 +588,7 @@ class NavasanService(CurrencyService):
             else NavasanService.goldsInEnglish[symbol]
         )
 
-    def get_price_description_row(
+    def render_price_description_row(
         self, symbol: str, language: str = "fa", no_price_message: str | None = None
     ) -> str:
         symbol_up = symbol.upper()
@@ -0,0 +1,164 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from struct import Struct
+from time import time
+from typing import Dict, List, Tuple
+import os
+from tools.manuwriter import log, prepare_folder
+
+
+class PriceSeries:
+    """Recent (timestamp, price) points of a single symbol, in two parallel arrays sorted by time."""
+
+    __slots__ = ("times", "prices")
+
+    def __init__(self) -> None:
+        self.times = array("d")
+        self.prices = array("d")
+
+
+class PriceHistory:
+    """Append-only time series of every polled price of a service. Recent points are kept in memory, between capacity
+    and twice the capacity per symbol, and all queries are answered from there. Every recorded snapshot is also appended
+    to a segment file of fixed-width records on a worker thread; a new segment is started every segment_seconds and the
+    oldest ones are removed, so at most max_segments files are kept. The latest segments are loaded back on startup.
+    Symbols longer than SYMBOL_SIZE bytes are only kept in memory."""
+
+    SYMBOL_SIZE = 16
+    RECORD = Struct(f"<{SYMBOL_SIZE}sdd")  # symbol, timestamp, price
+
+    def __init__(
+        self,
+        name: str,
+        folder: str,
+        capacity: int = 1440,
+        segment_seconds: int = 6 * 3600,
+        max_segments: int = 28,
+        load_segments: int = 4,
+    ) -> None:
+        self.name = name
+        self.folder = folder
+        self.capacity = capacity
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.series: Dict[str, PriceSeries] = {}
+        self.last_version: int | None = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-history")
+
+        # statistics
+        self.snapshots: int = 0
+        self.bytes_written: int = 0
+        self.removed_segments: int = 0
+        self.failures: int = 0
+        self.unpersisted_symbols: set = set()  # symbols too long for a record
+
+        try:
+            prepare_folder(folder)
+            self.load(load_segments)
+        except Exception as ex:
+            log(f"Failed loading {name} price history.", ex, category_name="PriceHistory")
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """(segment start time, file path) of the segment files, oldest first."""
+        segments = []
+        for filename in os.listdir(self.folder):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[0] == self.name and parts[2] == "seg" and parts[1].isdigit():
+                segments.append((int(parts[1]), f"{self.folder}/{filename}"))
+        return sorted(segments)
+
+    def load(self, segments_count: int):
+        if segments_count <= 0:
+            return
+        for _, path in self.segments()[-segments_count:]:
+            with open(path, "rb") as segment_file:
+                data = segment_file.read()
+            # an incomplete record at the end (due to a crash while appending) is ignored
+            complete_size = len(data) - len(data) % PriceHistory.RECORD.size
+            for symbol, timestamp, price in PriceHistory.RECORD.iter_unpack(data[:complete_size]):
+                self.append(symbol.rstrip(b"\0").decode(), timestamp, price)
+
+    def append(self, symbol: str, timestamp: float, price: float):
+        if not (series := self.series.get(symbol)):
+            series = self.series[symbol] = PriceSeries()
+        if series.times and timestamp < series.times[-1]:
+            return  # points must stay sorted by time
+        series.times.append(timestamp)
+        series.prices.append(price)
+        if len(series.times) > 2 * self.capacity:
+            del series.times[: -self.capacity]
+            del series.prices[: -self.capacity]
+
+    def record(self, prices: Dict[str, float], version: int | None = None, timestamp: float | None = None) -> bool:
+        """Append the prices of a service snapshot; a snapshot version which is already recorded is ignored."""
+        if version is not None and version == self.last_version:
+            return False
+        self.last_version = version
+        timestamp = timestamp or time()
+        records = bytearray()
+        for symbol, price in prices.items():
+            self.append(symbol, timestamp, price)
+            if len(encoded_symbol := symbol.encode()) <= PriceHistory.SYMBOL_SIZE:
+                records += PriceHistory.RECORD.pack(encoded_symbol, timestamp, price)
+            elif symbol not in self.unpersisted_symbols:
+                self.unpersisted_symbols.add(symbol)
+                log(
+                    f"{self.name} price history symbol {symbol} is longer than {PriceHistory.SYMBOL_SIZE} bytes; "
+                    "its prices are not persisted.",
+                    category_name="PriceHistory",
+                )
+        self.snapshots += 1
+        if records:
+            self.executor.submit(self.write, timestamp, bytes(records))
+        return True
+
+    def write(self, timestamp: float, records: bytes):
+        segment_start = int(timestamp // self.segment_seconds) * self.segment_seconds
+        path = f"{self.folder}/{self.name}.{segment_start}.seg"
+        try:
+            is_new_segment = not os.path.exists(path)
+            with open(path, "ab") as segment_file:
+                segment_file.write(records)
+            self.bytes_written += len(records)
+            if is_new_segment:
+                for _, old_path in self.segments()[: -self.max_segments]:
+                    os.remove(old_path)
+                    self.removed_segments += 1
+        except Exception as ex:
+            self.failures += 1
+            log(f"Failed appending {self.name} price history.", ex, category_name="PriceHistory")
+
+    def last(self, symbol: str, count: int = 1) -> List[Tuple[float, float]]:
+        if not (series := self.series.get(symbol)) or count <= 0:
+            return []
+        return list(zip(series.times[-count:], series.prices[-count:]))
+
+    def between(self, symbol: str, start: float, end: float) -> List[Tuple[float, float]]:
+        if not (series := self.series.get(symbol)):
+            return []
+        first, last = bisect_left(series.times, start), bisect_right(series.times, end)
+        return list(zip(series.times[first:last], series.prices[first:last]))
+
+    def window(self, symbol: str, seconds: float, now: float | None = None) -> Tuple[float, float, float | None] | None:
+        """(min, max, change percent) of the symbol price in the last given seconds."""
+        if not (series := self.series.get(symbol)):
+            return None
+        first = bisect_left(series.times, (now or time()) - seconds)
+        if first >= len(series.times):
+            return None
+        prices = series.prices[first:]
+        change = (prices[-1] - prices[0]) / prices[0] * 100 if prices[0] else None
+        return min(prices), max(prices), change
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    @property
+    def report(self) -> str:
+        points = sum(len(series.times) for series in self.series.values())
+        return (
+            f"{self.name} Price History: Symbols={len(self.series)}, Points={points}, Snapshots={self.snapshots}\n"
+            f"Bytes Written={self.bytes_written}, Removed Segments={self.removed_segments}, Failures={self.failures}, "
+            f"Unpersisted Symbols={len(self.unpersisted_symbols)}"
+        )
@@ -0,0 +1,154 @@
+from mmap import mmap, ACCESS_READ
+from threading import Lock
+from time import time
+from typing import Any, Dict
+import marshal
+import os
+from api.base import APIService, BaseAPIService
+from api.cache_writer import CacheWriter
+from api.crypto_service import CryptoCurrencyService
+from api.currency_service import NavasanService
+from tools.manuwriter import log, prepare_folder
+
+
+class WarmStartSnapshot:
+    """Binary snapshot of the whole price services state: latest & previous prices, usd/tether prices, manual overrides
+    and tether sources. It's written atomically after each market update and loaded on startup, so that prices and their
+    up/down states are available right after a restart, before the first update is done.
+    The state is captured on the event loop, but serialized & written on the cache writer thread; a save requested while
+    an older one is still waiting just replaces its state."""
+
+    VERSION = 1
+
+    def __init__(self, filename: str = "warmstart.bin") -> None:
+        self.path = f"./{BaseAPIService.cacheFolderPath}/{filename}"
+        self.saved_at: float | None = None
+        self.saves: int = 0
+        self.coalesced: int = 0
+        self.failures: int = 0
+        self.lock = Lock()
+        self.pending: Dict[str, Any] | None = None
+
+    @staticmethod
+    def copy_prices(data: Dict[str, Any] | None) -> Dict[str, Any] | None:
+        """Copy of a prices dict down to its items, since some items (usd price, etc.) are updated in place."""
+        if not isinstance(data, dict):
+            return data
+        return {key: dict(item) if isinstance(item, dict) else item for key, item in data.items()}
+
+    @staticmethod
+    def capture(currency_service: NavasanService, crypto_service: CryptoCurrencyService) -> Dict[str, Any]:
+        tether_services = (currency_service.tether_service, currency_service.alternate_tether_service)
+        return {
+            "version": WarmStartSnapshot.VERSION,
+            "saved_at": time(),
+            "usd": APIService.usdInTomans,
+            "tether": APIService.tetherInTomans,
+            "previous_tether": APIService.previousTetherInTomans,
+            "manual_usd": NavasanService.manualDollarPrice,
+            "manual_tether": NavasanService.manualTetherPrice,
+            "tether_source": currency_service.tether_toman_source.value,
+            "tether_values": {service.Source: service.recent_value for service in tether_services if service},
+            "currency": (
+                WarmStartSnapshot.copy_prices(currency_service.latest_data),
+                WarmStartSnapshot.copy_prices(currency_service.pre_latest_data),
+            ),
+            "crypto": (
+                WarmStartSnapshot.copy_prices(crypto_service.latest_data),
+                WarmStartSnapshot.copy_prices(getattr(crypto_service, "pre_latest_data", None)),
+            ),
+        }
+
+    def save(self, currency_service: NavasanService, crypto_service: CryptoCurrencyService) -> bool:
+        """Capture the current state and queue it to be written; returns False if the state could not be captured."""
+        try:
+            state = WarmStartSnapshot.capture(currency_service, crypto_service)
+        except Exception as ex:
+            self.failures += 1
+            log("Failed capturing warm start snapshot.", ex, category_name="CACHING")
+            return False
+        with self.lock:
+            if queued := self.pending is not None:
+                self.coalesced += 1
+            self.pending = state
+        if not queued and not CacheWriter.get().submit(self.write):
+            with self.lock:
+                self.pending = None
+            return False
+        return True
+
+    def write(self) -> bool:
+        with self.lock:
+            state, self.pending = self.pending, None
+        if state is None:
+            return False
+        temp_path = f"{self.path}.tmp"
+        try:
+            prepare_folder(BaseAPIService.cacheFolderPath)
+            with open(temp_path, "wb") as snapshot_file:
+                snapshot_file.write(marshal.dumps(state))
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temp_path, self.path)  # readers see either the previous snapshot or this one, never a partial one
+            self.saved_at = state["saved_at"]
+            self.saves += 1
+            return True
+        except Exception as ex:
+            self.failures += 1
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            log("Failed saving warm start snapshot.", ex, category_name="CACHING")
+        return False
+
+    def load(self) -> Dict[str, Any] | None:
+        try:
+            if not os.path.exists(self.path) or not os.path.getsize(self.path):
+                return None
+            with open(self.path, "rb") as snapshot_file, mmap(snapshot_file.fileno(), 0, access=ACCESS_READ) as buffer:
+                state = marshal.loads(buffer)
+            if not isinstance(state, dict) or state.get("version") != WarmStartSnapshot.VERSION:
+                return None
+            return state
+        except Exception as ex:
+            log("Failed loading warm start snapshot.", ex, category_name="CACHING")
+        return None
+
+    def restore(self, currency_service: NavasanService, crypto_service: CryptoCurrencyService) -> bool:
+        """Load the last snapshot into the services; returns False if there was no usable snapshot."""
+        if not (state := self.load()):
+            return False
+        try:
+            NavasanService.manualDollarPrice = state["manual_usd"]
+            NavasanService.manualTetherPrice = state["manual_tether"]
+            if state["usd"]:
+                APIService.usdInTomans = state["usd"]
+            if state["tether"]:
+                APIService.tetherInTomans = state["tether"]
+                APIService.previousTetherInTomans = state["previous_tether"]
+            APIService.unitPricesVersion += 1
+            try:
+                currency_service.switch_tether_toman_source(state["tether_source"])
+            except Exception as ex:
+                log("Failed restoring tether source from warm start snapshot.", ex, category_name="CACHING")
+            for service in (currency_service.tether_service, currency_service.alternate_tether_service):
+                if service and service.Source in state["tether_values"]:
+                    service.recent_value = state["tether_values"][service.Source]
+
+            if state["currency"][0]:
+                currency_service.latest_data, currency_service.pre_latest_data = state["currency"]
+                currency_service.publish_snapshot()
+            if state["crypto"][0]:
+                crypto_service.latest_data, crypto_service.pre_latest_data = state["crypto"]
+                crypto_service.publish_snapshot()
+            self.saved_at = state["saved_at"]
+            return True
+        except Exception as ex:
+            log("Failed restoring warm start snapshot.", ex, category_name="CACHING")
+        return False
+
+    @property
+    def report(self) -> str:
+        age = f"{time() - self.saved_at:.0f}s" if self.saved_at else "-"
+        return f"Warm Start Snapshot: Saves={self.saves}, Coalesced={self.coalesced}, Failures={self.failures}, Age={age}"
@@ -24,7 +24,14 @@ async def open_create_alarm_section(update: Update, context: CallbackContext):
 
 
 def main(run_webhook: bool = True):
-    app = BotApplicationBuilder().token(botman.token).build()
+    app = (
+        BotApplicationBuilder()
+        .token(botman.token)
+        .rate_limiter(botman.outbox)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
     app.add_handler(CommandHandler("start", cmd_welcome))
     app.add_handler(CommandHandler("view", cmd_get_prices))
     app.add_handler(CommandHandler("view_list", open_price_list_section))
@@ -59,6 +66,7 @@ def main(run_webhook: bool = True):
     app.add_handler(CommandHandler("unset_usd", cmd_unset_manual_usd_price))
     app.add_handler(CommandHandler("unset_tether", cmd_unset_manual_tether_price))
     app.add_handler(CommandHandler("switch_usdt_source", cmd_switch_usdt_source))
+    app.add_handler(CommandHandler("perf", cmd_report_performance))
 
     app.add_handler(CallbackQueryHandler(handle_inline_keyboard_callbacks))
     app.add_handler(ChatMemberHandler(handle_new_group_members, ChatMemberHandler.MY_CHAT_MEMBER))
@@ -0,0 +1,82 @@
+from json import dumps as jsonify, loads as parse_json
+from typing import Any, Dict
+
+
+class CallbackData:
+    """Compact codec of inline keyboard callback data. Payloads are a version tag, a kind letter and comma separated
+    fields in a fixed order, with the value as the last field, since it is the only one which may contain commas:
+        action: 1a<act>,<pg>,<value>
+        choice: 1c<lt>,<bt>,<pg>,<value>
+    Values are prefixed by their type: n(one), t(rue), f(alse), i(nt), d(ecimal), s(tr) and j(son) for anything else.
+    Decoding returns the same dict as the older json payloads did, and those are still accepted."""
+
+    VERSION = "1"
+    ACTION = VERSION + "a"
+    CHOICE = VERSION + "c"
+
+    @staticmethod
+    def encodeValue(value: Any) -> str:
+        if value is None:
+            return "n"
+        if value is True:
+            return "t"
+        if value is False:
+            return "f"
+        if isinstance(value, str):
+            return "s" + value
+        if isinstance(value, int):
+            return f"i{value}"
+        if isinstance(value, float):
+            return f"d{value!r}"
+        return "j" + jsonify(value, separators=(",", ":"))
+
+    @staticmethod
+    def decodeValue(field: str) -> Any:
+        tag, body = field[:1], field[1:]
+        if tag == "s":
+            return body
+        if tag == "i":
+            return int(body)
+        if tag == "n":
+            return None
+        if tag == "t":
+            return True
+        if tag == "f":
+            return False
+        if tag == "d":
+            return float(body)
+        if tag == "j":
+            return parse_json(body)
+        raise ValueError(f"Unknown callback value type: {field}")
+
+    @staticmethod
+    def action(action: int, value: Any, page: int | None = None) -> str:
+        return f"{CallbackData.ACTION}{action},{'' if page is None else page},{CallbackData.encodeValue(value)}"
+
+    @staticmethod
+    def choice(list_type: int | None, button_type: int, value: Any = None, page: int | None = 0) -> str:
+        return (
+            f"{CallbackData.CHOICE}{'' if list_type is None else list_type},{button_type},"
+            f"{'' if page is None else page},{CallbackData.encodeValue(value)}"
+        )
+
+    @staticmethod
+    def decode(data: str) -> Dict[str, Any]:
+        if data[:1] == "{":
+            return parse_json(data)  # keyboards sent before the compact format
+        kind = data[:2]
+        if kind == CallbackData.CHOICE:
+            list_type, button_type, page, value = data[2:].split(",", 3)
+            return {
+                "lt": int(list_type) if list_type else None,
+                "bt": int(button_type),
+                "pg": int(page) if page else None,
+                "v": CallbackData.decodeValue(value),
+            }
+        if kind == CallbackData.ACTION:
+            action, page, value = data[2:].split(",", 2)
+            callback_data = {"act": int(action), "v": CallbackData.decodeValue(value)}
+            if page:
+                callback_data["pg"] = int(page)
+            return callback_data
+        raise ValueError(f"Unknown callback data format: {data}")
@@ -12,7 +12,6 @@ from telegram import (
 )
 from telegram.error import BadRequest, Forbidden
 from models.account import Account
-import json
 from tools.manuwriter import log
 from tools.mathematix import (
     cut_and_separate,
@@ -22,6 +21,8 @@ from tools.mathematix import (
     now_in_minute,
 )
 from bot.manager import BotMan
+from bot.outbox import SendPriority
+from bot.callbacks import CallbackData
 from bot.types import MarketOptions, SelectionListTypes
 from api.crypto_service import CoinMarketCapService
 from models.alarms import PriceAlarm
@@ -43,7 +44,7 @@ botman = BotMan()
 
 
 async def show_market_types(update: Update, context: CallbackContext, next_state: Account.States):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not await botman.has_subscribed_us(account.chat_id, context):
         await botman.ask_for_subscription(update, account.language)
         return
@@ -55,7 +56,7 @@ async def show_market_types(update: Update, context: CallbackContext, next_state
 
 
 async def prepare_market_selection_menu(update: Update, context: CallbackContext, market: MarketOptions):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not await botman.has_subscribed_us(account.chat_id, context):
         await botman.ask_for_subscription(update, account.language)
         return
@@ -116,7 +117,7 @@ async def update_markets(context: CallbackContext):
 
 
 async def cmd_welcome(update: Update | CallbackQuery, context: CallbackContext):
-    acc = Account.get(update.message.chat)
+    acc = await Account.getAsync(update.message.chat)
     # get old or create new account => automatically will be added to Account.Instances
     if not await botman.has_subscribed_us(acc.chat_id, context):
         return await botman.ask_for_subscription(update, acc.language)
@@ -133,7 +134,7 @@ async def cmd_welcome(update: Update | CallbackQuery, context: CallbackContext):
 
 
 async def cmd_get_prices(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not await botman.has_subscribed_us(account.chat_id, context):
         return await botman.ask_for_subscription(update, account.language)
     is_latest_data_valid = (
@@ -154,7 +155,7 @@ async def cmd_get_prices(update: Update, context: CallbackContext):
 
 
 async def cmd_equalizer(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not await botman.has_subscribed_us(account.chat_id, context):
         return await botman.ask_for_subscription(update, account.language)
 
@@ -172,6 +173,16 @@ async def cmd_equalizer(update: Update, context: CallbackContext):
     )
 
 
+async def on_startup(app: TelegramApplication):
+    """Prepares the resources that live as long as the bot application does."""
+    await botman.startup()
+
+
+async def on_shutdown(app: TelegramApplication):
+    """Releases the long living resources, such as pooled connections."""
+    await botman.shutdown()
+
+
 def plan_market_updates(context: CallbackContext | TelegramApplication, interval: float | int = 10):
     if botman.is_main_plan_on:
         raise InvalidInputException("Command; Channel already planned!")
@@ -190,7 +201,7 @@ def plan_market_updates(context: CallbackContext | TelegramApplication, interval
 
 
 async def cmd_schedule_channel_update(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
 
@@ -216,7 +227,7 @@ async def cmd_schedule_channel_update(update: Update, context: CallbackContext):
 
 
 async def cmd_stop_schedule(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
 
@@ -228,7 +239,7 @@ async def cmd_stop_schedule(update: Update, context: CallbackContext):
 
 
 async def cmd_admin_login(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
 
@@ -239,7 +250,7 @@ async def cmd_admin_login(update: Update, context: CallbackContext):
 
 
 async def cmd_upgrade_user(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_admin and not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     account.change_state(Account.States.UPGRADE_USER)
@@ -251,7 +262,7 @@ async def cmd_upgrade_user(update: Update, context: CallbackContext):
 
 
 async def cmd_add_admin(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     account.change_state(Account.States.ADD_ADMIN)
@@ -263,7 +274,7 @@ async def cmd_add_admin(update: Update, context: CallbackContext):
 
 
 async def cmd_remove_admin(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     admins = Account.getStaffAdmins()
@@ -280,7 +291,7 @@ async def cmd_remove_admin(update: Update, context: CallbackContext):
 
 
 async def cmd_list_users_to_downgrade(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_admin and not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
 
@@ -295,7 +306,7 @@ async def cmd_list_users_to_downgrade(update: Update, context: CallbackContext):
 
 
 async def cmd_send_post(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
 
@@ -307,7 +318,7 @@ async def cmd_send_post(update: Update, context: CallbackContext):
 
 
 async def cmd_report_statistics(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
 
@@ -330,7 +341,7 @@ async def cmd_report_statistics(update: Update, context: CallbackContext):
 
 
 async def cmd_send_plans_post(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     account.change_state(Account.States.CHANGE_PREMIUM_PLANS)
@@ -387,7 +398,7 @@ async def start_equalizing(func_send_message, account: Account, amounts: list, u
 
 
 async def list_user_alarms(update: Update | CallbackQuery, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not await botman.has_subscribed_us(account.chat_id, context):
         await botman.ask_for_subscription(update, account.language)
         return
@@ -469,7 +480,6 @@ async def handle_action_queries(
     value = None
 
     if callback_data:
-        callback_data = json.loads(str(query.data))
         action = callback_data["act"]
         value = callback_data["v"]
 
@@ -772,6 +782,7 @@ async def handle_action_queries(
                     await query.message.edit_text(botman.error("unexpected_error", account.language))
         case BotMan.QueryActions.IVE_SUBSCRIBED.value:
             if value:
+                botman.membership_cache.invalidate(account.chat_id)  # the user claims a new membership; check it again
                 await asyncio.gather(
                     cmd_welcome(query, context),
                     query.message.delete(),
@@ -953,8 +964,8 @@ async def handle_inline_keyboard_callbacks(update: Update, context: CallbackCont
     if not query.data:
         return
 
-    data = json.loads(query.data)
-    account: Account = Account.get(query.message.chat)
+    data = CallbackData.decode(query.data)
+    account: Account = await Account.getAsync(query.message.chat)
     # first check query type
     if "act" in data:
         # action queries are handled here
@@ -1112,7 +1123,7 @@ async def handle_inline_keyboard_callbacks(update: Update, context: CallbackCont
 
 
 async def cmd_switch_language(update: Update, _: CallbackContext):
-    acc = Account.get(update.message.chat)
+    acc = await Account.getAsync(update.message.chat)
     BotMan.updateUserLanguage(acc, "en" if acc.language != "en" else "fa")
     await update.message.reply_text(
         botman.resourceman.text_for_case_sensitive_key("language_switched", acc.language),
@@ -1121,7 +1132,7 @@ async def cmd_switch_language(update: Update, _: CallbackContext):
 
 
 async def list_type_is_selected(update: Update):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if account.state not in [
         Account.States.CONFIG_CALCULATOR_LIST,
         Account.States.INPUT_EQUALIZER_UNIT,
@@ -1140,7 +1151,7 @@ async def list_type_is_selected(update: Update):
 
 # premiums:
 async def cmd_start_using_in_channel(update: Update, _: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     account.change_state(Account.States.ADD_BOT_AS_ADMIN)
     account.delete_specific_cache("channel_chat_id", "community")
     await update.message.reply_text(
@@ -1150,7 +1161,7 @@ async def cmd_start_using_in_channel(update: Update, _: CallbackContext):
 
 
 async def handle_cmd_show_my_plan_status(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     days_remaining = account.premium_days_remaining
     if days_remaining < 0:
         await botman.send_message_with_premium_button(
@@ -1176,7 +1187,7 @@ async def handle_cmd_show_my_plan_status(update: Update, context: CallbackContex
 
 async def admin_renew_plans(update: Update, context: CallbackContext, account: Account | None = None):
     if not account:
-        account = Account.get(update.message.chat)
+        account = await Account.getAsync(update.message.chat)
     if account.is_authorized(context.args):
         if account.state == Account.States.CHANGE_PREMIUM_PLANS:
             post: str | None = None
@@ -1207,7 +1218,7 @@ async def admin_renew_plans(update: Update, context: CallbackContext, account: A
 
 
 async def unknown_command_handler(update: Update, _: CallbackContext = None):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     await update.message.reply_text(
         botman.error("what_the_fuck", account.language),
         reply_markup=(
@@ -1236,7 +1247,7 @@ async def go_to_community_panel(update: Update, account: Account, community_type
 
 
 async def handle_cmd_channels(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     channel = Channel.getByOwner(account.chat_id, take=1)
     if not channel:
         await cmd_start_using_in_channel(update, context)
@@ -1259,7 +1270,7 @@ async def handle_cmd_channels(update: Update, context: CallbackContext):
 
 
 async def handle_cmd_groups(update: Update, _: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not Group.userHasAnyGroups(account.chat_id):
         if account.is_premium:
             await update.message.reply_text(botman.text("add_bot_as_group_admin", account.language))
@@ -1274,7 +1285,7 @@ async def handle_cmd_groups(update: Update, _: CallbackContext):
 
 
 async def handle_cmd_show_premium_plans(update: Update | CallbackQuery, _: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     post_text, post_photo = BotSettings.get().PREMIUM_PLANS_POST(account.language)
     if post_photo:
         await update.message.reply_photo(
@@ -1327,7 +1338,7 @@ async def handle_messages(update: Update, context: CallbackContext):
 
         # community sub menu:
         case BotMan.Commands.CHANNELS_CHANGE_INTERVAL_FA.value | BotMan.Commands.CHANNELS_CHANGE_INTERVAL_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             channel = Channel.getByOwner(account.chat_id)
             if not channel:
                 account.delete_specific_cache("community")
@@ -1343,7 +1354,7 @@ async def handle_messages(update: Update, context: CallbackContext):
         case (
             BotMan.Commands.COMMUNITY_CONFIG_PRICE_LIST_FA.value | BotMan.Commands.COMMUNITY_CONFIG_PRICE_LIST_EN.value
         ):
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             community_type = BotMan.CommunityType.which(account.get_cache("community"))
             if not community_type:
                 await unknown_command_handler(update, context)
@@ -1359,7 +1370,7 @@ async def handle_messages(update: Update, context: CallbackContext):
                 ),
             )
         case BotMan.Commands.COMMUNITY_TRIGGER_DATE_TAG_FA.value | BotMan.Commands.COMMUNITY_TRIGGER_DATE_TAG_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             community_type = account.get_cache("community")
             if not BotMan.CommunityType.which(community_type):
                 await unknown_command_handler(update, context)
@@ -1379,7 +1390,7 @@ async def handle_messages(update: Update, context: CallbackContext):
             BotMan.Commands.COMMUNITY_TRIGGER_MARKET_TAGS_FA.value
             | BotMan.Commands.COMMUNITY_TRIGGER_MARKET_TAGS_EN.value
         ):
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             community_type = account.get_cache("community")
             if not BotMan.CommunityType.which(community_type):
                 await unknown_command_handler(update, context)
@@ -1407,7 +1418,7 @@ async def handle_messages(update: Update, context: CallbackContext):
                 and message_text != BotMan.Commands.COMMUNITY_SET_MESSAGE_FOOTNOTE_EN.value
                 else ("footer", Account.States.SET_MESSAGE_FOOTNOTE)
             )
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             community_type = account.get_cache("community")
             if not BotMan.CommunityType.which(community_type):
                 await unknown_command_handler(update, context)
@@ -1425,7 +1436,7 @@ async def handle_messages(update: Update, context: CallbackContext):
             )
             account.change_state(state, "msg2delete", telegram_res.message_id)
         case BotMan.Commands.GROUP_CHANGE_FA.value | BotMan.Commands.GROUP_CHANGE_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             group = Group.getByOwner(account.chat_id)
             if not group:
                 account.delete_specific_cache("community")
@@ -1441,7 +1452,7 @@ async def handle_messages(update: Update, context: CallbackContext):
                 reply_markup=botman.cancel_menu(account.language),
             )
         case BotMan.Commands.CHANNEL_CHANGE_FA.value | BotMan.Commands.CHANNEL_CHANGE_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             if not Channel.getByOwner(account.chat_id):
                 account.delete_specific_cache("community")
                 await update.message.reply_text(
@@ -1460,7 +1471,7 @@ async def handle_messages(update: Update, context: CallbackContext):
                 reply_markup=botman.cancel_menu(account.language),
             )
         case BotMan.Commands.COMMUNITY_DISCONNECT_FA.value | BotMan.Commands.COMMUNITY_DISCONNECT_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             if not (
                 community := BotMan.getCommunity(
                     (community_type := BotMan.CommunityType.which(account.get_cache("community"))),
@@ -1487,7 +1498,7 @@ async def handle_messages(update: Update, context: CallbackContext):
             )
         # settings sub menu:
         case BotMan.Commands.SET_BOT_LANGUAGE_FA.value | BotMan.Commands.SET_BOT_LANGUAGE_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             if not await botman.has_subscribed_us(account.chat_id, context):
                 await botman.ask_for_subscription(update, account.language)
                 return
@@ -1500,7 +1511,7 @@ async def handle_messages(update: Update, context: CallbackContext):
                 ),
             )
         case BotMan.Commands.FACTORY_RESET_FA.value | BotMan.Commands.FACTORY_RESET_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             await update.message.reply_text(
                 botman.text("factory_reset_confirmation", account.language),
                 reply_markup=botman.action_inline_keyboard(
@@ -1519,12 +1530,12 @@ async def handle_messages(update: Update, context: CallbackContext):
                 chat_id=update.message.chat_id,
                 text=botman.text(
                     "check_our_other_collections",
-                    Account.get(update.message.chat).language,
+                    (await Account.getAsync(update.message.chat)).language,
                 ),
                 disable_web_page_preview=True,
             )
         case BotMan.Commands.TUTORIALS_FA.value | BotMan.Commands.TUTORIALS_EN.value:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             await update.message.reply_text(
                 botman.text("click_tutorial_u_need", account.language),
                 reply_markup=botman.action_inline_keyboard(
@@ -1552,7 +1563,7 @@ async def handle_messages(update: Update, context: CallbackContext):
             | BotMan.Commands.RETURN_FA.value
             | BotMan.Commands.RETURN_EN.value
         ):
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             prev_menu = account.get_cache("back")
             if prev_menu:
                 match prev_menu:
@@ -1585,7 +1596,7 @@ async def handle_messages(update: Update, context: CallbackContext):
         # special states
         case _:
             # check account state first, to see if he/she is in input state
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             if account.is_admin:
                 match message_text:
                     case (
@@ -1921,65 +1932,11 @@ async def handle_messages(update: Update, context: CallbackContext):
                             except Exception as x:
                                 pass
 
-                            post_tasks = await asyncio.gather(
-                                *[update.message.copy(chat_id) for chat_id in all_accounts],
-                                return_exceptions=True,
-                            )
-
-                            users_count, not_received = len(all_accounts), len(
-                                list(
-                                    filter(
-                                        lambda t: isinstance(t, BaseException),
-                                        post_tasks,
-                                    )
-                                )
-                            )
-                            await asyncio.gather(
-                                context.bot.delete_message(chat_id=account.chat_id, message_id=message_id),
-                                update.message.reply_text(
-                                    botman.text("post_successfully_sent", account.language)
-                                    % (users_count, users_count - not_received),
-                                    reply_markup=botman.get_admin_primary_keyboard(account),
-                                ),
-                                return_exceptions=True,
-                            )
-
                             account.change_state()
-                            if removal_time:
-                                trash_type = Account.database().TrashType.MESSAGE.value
-                                try:
-                                    Account.schedulePostsForRemoval(
-                                        [
-                                            (
-                                                trash_type,
-                                                all_accounts[i],
-                                                task.message_id,
-                                                removal_time,
-                                            )
-                                            for i, task in enumerate(post_tasks)
-                                            if not isinstance(task, BaseException)
-                                        ]
-                                    )
-                                    await update.message.reply_text(
-                                        botman.text(
-                                            "posts_scheduled_for_removal",
-                                            account.language,
-                                        ),
-                                        reply_markup=botman.get_admin_primary_keyboard(account),
-                                    )
-                                except Exception as x:
-                                    log(
-                                        "Failed to schedule admin post for removal",
-                                        x,
-                                        category_name="Admin",
-                                    )
-                                    await update.message.reply_text(
-                                        botman.text(
-                                            "posts_sent_by_not_scheduled",
-                                            account.language,
-                                        ),
-                                        reply_markup=botman.get_admin_primary_keyboard(account),
-                                    )
+                            # sending is paced by the outbox, so it is done in background, not to block other updates
+                            context.application.create_task(
+                                broadcast_admin_post(update, context, account, all_accounts, message_id, removal_time)
+                            )
                         case Account.States.CHANGE_PREMIUM_PLANS:
                             await admin_renew_plans(update, context, account)
 
@@ -2031,6 +1988,81 @@ async def handle_messages(update: Update, context: CallbackContext):
                             account.change_state()
 
 
+async def broadcast_admin_post(
+    update: Update,
+    context: CallbackContext,
+    account: Account,
+    all_accounts: List[int],
+    message_id: int,
+    removal_time: int | None = None,
+):
+    post_tasks = await asyncio.gather(
+        *[
+            context.bot.copy_message(
+                chat_id=chat_id,
+                from_chat_id=update.message.chat_id,
+                message_id=update.message.message_id,
+                rate_limit_args=SendPriority.BROADCAST,
+            )
+            for chat_id in all_accounts
+        ],
+        return_exceptions=True,
+    )
+
+    users_count, not_received = len(all_accounts), len(
+        list(
+            filter(
+                lambda t: isinstance(t, BaseException),
+                post_tasks,
+            )
+        )
+    )
+    await asyncio.gather(
+        context.bot.delete_message(chat_id=account.chat_id, message_id=message_id),
+        update.message.reply_text(
+            botman.text("post_successfully_sent", account.language) % (users_count, users_count - not_received),
+            reply_markup=botman.get_admin_primary_keyboard(account),
+        ),
+        return_exceptions=True,
+    )
+
+    if removal_time:
+        trash_type = Account.database().TrashType.MESSAGE.value
+        try:
+            Account.schedulePostsForRemoval(
+                [
+                    (
+                        trash_type,
+                        all_accounts[i],
+                        task.message_id,
+                        removal_time,
+                    )
+                    for i, task in enumerate(post_tasks)
+                    if not isinstance(task, BaseException)
+                ]
+            )
+            await update.message.reply_text(
+                botman.text(
+                    "posts_scheduled_for_removal",
+                    account.language,
+                ),
+                reply_markup=botman.get_admin_primary_keyboard(account),
+            )
+        except Exception as x:
+            log(
+                "Failed to schedule admin post for removal",
+                x,
+                category_name="Admin",
+            )
+            await update.message.reply_text(
+                botman.text(
+                    "posts_sent_by_not_scheduled",
+                    account.language,
+                ),
+                reply_markup=botman.get_admin_primary_keyboard(account),
+            )
+
+
 async def handle_new_group_members(update: Update, context: CallbackContext):
     if not update.my_chat_member or not update.my_chat_member.new_chat_member:
         return
@@ -2065,7 +2097,7 @@ async def handle_new_group_members(update: Update, context: CallbackContext):
             if owner.state == Account.States.CHANGE_GROUP:
                 old_group_id = owner.get_cache("changing_id")
                 old_group: Group
-                if not old_group_id or not (old_group := Group.get(old_group_id)):
+                if not old_group_id or not (old_group := await Group.getAsync(old_group_id)):
                     await context.bot.send_message(
                         chat_id=owner.chat_id,
                         text=botman.error("unexpected_error", owner.language),
@@ -2135,7 +2167,7 @@ async def handle_new_group_members(update: Update, context: CallbackContext):
 
 
 async def cmd_refresh(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     if not account.is_authorized(context.args):
         await update.message.reply_text(
             botman.error("what_the_fuck", account.language),
@@ -2143,7 +2175,8 @@ async def cmd_refresh(update: Update, context: CallbackContext):
         )
         return
     botman.refreshMemory()
-    account = Account.get(update.message.chat)
+    botman.tokens_menu_cache.clear()
+    account = await Account.getAsync(update.message.chat)
     await update.message.reply_text(
         "Successfully refreshed.",
         reply_markup=botman.mainkeyboard(account),
@@ -2154,11 +2187,12 @@ async def handle_group_messages(update: Update, _: CallbackContext):
     if not update.message or not update.message.text:
         return
     crypto_amounts, currency_amounts = botman.extract_symbols_and_amounts(update.message.text)
-    group: Group = Group.get(update.message.chat.id)
-    to_user: Account = Account.getById(update.message.from_user.id, should_create=False)
-
-    if not group or not group.is_active:
+    if not crypto_amounts and not currency_amounts:
+        return  # most group messages mention no token; drop them before any group/account lookup
+    group: Group = await Group.getAsync(update.message.chat.id)
+    if not group or not (await Account.getByIdAsync(group.owner_id)).is_premium:  # same as group.is_active
         return
+    to_user: Account = await Account.getByIdAsync(update.message.from_user.id, should_create=False)
 
     tasks = []
     for input_list in [
@@ -2223,7 +2257,7 @@ async def handle_cmd_settings(update: Update, _: CallbackContext):
 
 ### Developer options:
 async def cmd_add_cmc_api_key(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     args = account.extract_args_if_authorized(context.args)
     if not args:
         return await say_youre_not_allowed(update.message.reply_text, account)
@@ -2239,7 +2273,7 @@ async def cmd_add_cmc_api_key(update: Update, context: CallbackContext):
 
 
 async def cmd_remove_cmc_api_key(update: Update, context: CallbackContext):
-    account = Account.get(update.message.chat)
+    account = await Account.getAsync(update.message.chat)
     args = account.extract_args_if_authorized(context.args)
     if not args:
         return await say_youre_not_allowed(update.message.reply_text, account)
@@ -2254,7 +2288,7 @@ async def cmd_remove_cmc_api_key(update: Update, context: CallbackContext):
 
 
 async def cmd_list_cmc_api_key(update: Update, context: CallbackContext):
-    if not (account := Account.get(update.message.chat)).is_authorized(context.args):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     try:
         await update.message.reply_text(
@@ -2264,12 +2298,22 @@ async def cmd_list_cmc_api_key(update: Update, context: CallbackContext):
     except Exception as x:
         await update.message.reply_text(x.__str__(), reply_markup=botman.get_admin_primary_keyboard(account))
 
+async def cmd_report_performance(update: Update, context: CallbackContext):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
+        return await say_youre_not_allowed(update.message.reply_text, account)
+    try:
+        for report in botman.collect_performance_stats():
+            await update.message.reply_text(report, reply_markup=botman.get_admin_primary_keyboard(account))
+    except Exception as x:
+        await update.message.reply_text(x.__str__(), reply_markup=botman.get_admin_primary_keyboard(account))
+
 async def cmd_switch_usdt_source(update: Update, context: CallbackContext):
-    if not (account := Account.get(update.message.chat)).is_authorized(context.args):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     try:
         args = account.extract_args_if_authorized(context.args)
         botman.currency_serv.switch_tether_toman_source(args[0])
+        botman.postman.save_warm_start()
         await update.message.reply_text(
             "Successfully switched tether price source.",
             reply_markup=botman.get_admin_primary_keyboard(account),
@@ -2278,11 +2322,12 @@ async def cmd_switch_usdt_source(update: Update, context: CallbackContext):
         await update.message.reply_text(x.__str__(), reply_markup=botman.get_admin_primary_keyboard(account))
 
 async def cmd_set_manual_tether_price(update: Update, context: CallbackContext):
-    if not (account := Account.get(update.message.chat)).is_authorized(context.args):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     try:
         args = account.extract_args_if_authorized(context.args)
         botman.currency_serv.set_manual_tether_price(float(args[0]))
+        botman.postman.save_warm_start()
         await update.message.reply_text(
             "Successfully set tether price.",
             reply_markup=botman.get_admin_primary_keyboard(account),
@@ -2291,10 +2336,11 @@ async def cmd_set_manual_tether_price(update: Update, context: CallbackContext):
         await update.message.reply_text(x.__str__(), reply_markup=botman.get_admin_primary_keyboard(account))
 
 async def cmd_unset_manual_tether_price(update: Update, context: CallbackContext):
-    if not (account := Account.get(update.message.chat)).is_authorized(context.args):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     try:
         botman.currency_serv.set_manual_tether_price()
+        botman.postman.save_warm_start()
         await update.message.reply_text(
             "Tether price source returned to normal mode.",
             reply_markup=botman.get_admin_primary_keyboard(account),
@@ -2303,11 +2349,12 @@ async def cmd_unset_manual_tether_price(update: Update, context: CallbackContext
         await update.message.reply_text(x.__str__(), reply_markup=botman.get_admin_primary_keyboard(account))
 
 async def cmd_set_manual_usd_price(update: Update, context: CallbackContext):
-    if not (account := Account.get(update.message.chat)).is_authorized(context.args):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     try:
         args = account.extract_args_if_authorized(context.args)
         botman.currency_serv.set_manual_usd_price(float(args[0]))
+        botman.postman.save_warm_start()
         await update.message.reply_text(
             "Successfully set dollar price.",
             reply_markup=botman.get_admin_primary_keyboard(account),
@@ -2316,10 +2363,11 @@ async def cmd_set_manual_usd_price(update: Update, context: CallbackContext):
         await update.message.reply_text(x.__str__(), reply_markup=botman.get_admin_primary_keyboard(account))
 
 async def cmd_unset_manual_usd_price(update: Update, context: CallbackContext):
-    if not (account := Account.get(update.message.chat)).is_authorized(context.args):
+    if not (account := await Account.getAsync(update.message.chat)).is_authorized(context.args):
         return await say_youre_not_allowed(update.message.reply_text, account)
     try:
         botman.currency_serv.set_manual_usd_price()
+        botman.postman.save_warm_start()
         await update.message.reply_text(
             "Dollar price source returned to navasan.",
             reply_markup=botman.get_admin_primary_keyboard(account),
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Tuple
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+# each row item is the choice it selects (or None for control buttons such as pagination) and its prebuilt button
+TokensMenuRows = List[List[Tuple[str | None, InlineKeyboardButton]]]
+
+
+class TokensMenuCache:
+    """Prebuilt button grids of the token selection menus, per list type, market, language, page & layout options.
+    Selections are not part of a grid; they are applied as an overlay, which only replaces the selected buttons.
+    A grid is rebuilt when its choices dict is replaced (token list updated), or when the whole cache is cleared."""
+
+    SELECTED_MARK = "✅"
+
+    def __init__(self, capacity: int = 512) -> None:
+        self.capacity = capacity
+        self.grids: OrderedDict[tuple, Tuple[Dict[str, str], TokensMenuRows]] = OrderedDict()
+
+        # statistics
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: tuple, choices: Dict[str, str], builder: Callable[[], TokensMenuRows]) -> TokensMenuRows:
+        entry = self.grids.get(key)
+        if entry is not None and entry[0] is choices:
+            self.hits += 1
+            self.grids.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        rows = builder()
+        self.grids[key] = (choices, rows)
+        self.grids.move_to_end(key)
+        if len(self.grids) > self.capacity:
+            self.grids.popitem(last=False)
+        return rows
+
+    @staticmethod
+    def overlay(rows: TokensMenuRows, selected_ones: Iterable[str] | None = None) -> InlineKeyboardMarkup:
+        if not selected_ones:
+            return InlineKeyboardMarkup([[button for _, button in row] for row in rows])
+        selected_ones = set(selected_ones)
+        return InlineKeyboardMarkup(
+            [
+                [
+                    (
+                        button
+                        if choice is None or choice not in selected_ones
+                        else InlineKeyboardButton(
+                            button.text + TokensMenuCache.SELECTED_MARK, callback_data=button.callback_data
+                        )
+                    )
+                    for choice, button in row
+                ]
+                for row in rows
+            ]
+        )
+
+    def clear(self):
+        self.grids.clear()
+
+    @property
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        return (
+            f"Tokens Menu Cache: Grids={len(self.grids)}, Hits={self.hits}, Misses={self.misses}, "
+            f"Hit Rate={(self.hits / lookups if lookups else 0) * 100:.1f}%"
+        )
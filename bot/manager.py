@@ -21,12 +21,19 @@ from telegram.ext import CallbackContext
 from telegram.error import BadRequest, Forbidden
 from api.currency_service import CurrencyService
 from api.crypto_service import CryptoCurrencyService
-from json import dumps as jsonify
+from api.base import APIService
+from api.api_async import SessionManager
+from api.cache_writer import CacheWriter
+from bot.outbox import Outbox, SendPriority
+from bot.membership import MembershipCache
+from bot.callbacks import CallbackData
+from bot.keyboards import TokensMenuCache, TokensMenuRows
 from typing import List, Dict, Tuple, Set, Coroutine, Any, Callable
 from bot.post import PostMan
 from models.account import Account
 from models.channel import Channel, PostInterval
 from models.group import Group
+from db.async_interface import AsyncDatabaseInterface
 from tools.manuwriter import log, load_json
 from tools.mathematix import (
     persianify,
@@ -37,7 +44,7 @@ from tools.mathematix import (
     normal_float_display,
 )
 from models.alarms import PriceAlarm
-from tools.optifinder import OptiFinder
+from tools.optifinder import SymbolTrie
 from .types import (
     GroupInlineKeyboardButtonTemplate,
     SelectionListTypes,
@@ -47,6 +54,7 @@ from .types import (
 from math import ceil as math_ceil
 from .settings import BotSettings
 import asyncio
+from time import time
 
 
 resourceman = ResourceManager("texts", "resources")
@@ -281,6 +289,9 @@ class BotMan:
         self.main_queue_id: str = "mainplan"
         self.main_plan_interval: float = main_plan_interval or float(config("MAIN_CHANNEL_DEFAULT_INTERVAL", 10.0))
         self.plan_manager_interval: float = plan_manager_interval
+        self.market_source_deadline: float = float(config("MARKET_SOURCE_DEADLINE", 20.0))
+        self.market_update_deadline: float = float(config("MARKET_UPDATE_DEADLINE", 30.0))
+        self.market_update_stats: Dict[str, Dict[str, int | float]] = {}
 
         self.text = self.resourceman.text
         self.error = self.resourceman.error
@@ -293,6 +304,19 @@ class BotMan:
 
         self.setup_main_keyboards()
         self.is_main_plan_on: bool = False
+        self.symbol_trie: SymbolTrie | None = None
+        self.outbox = Outbox(
+            messages_per_second=float(config("TELEGRAM_MESSAGES_PER_SECOND", 30.0)),
+            private_chat_rate=float(config("TELEGRAM_PRIVATE_CHAT_RATE", 1.0)),
+            group_chat_rate=float(config("TELEGRAM_GROUP_CHAT_RATE", 20 / 60)),
+        )
+        self.membership_cache = MembershipCache(
+            ttl=float(config("MEMBERSHIP_CACHE_TTL", 3600)),
+            negative_ttl=float(config("MEMBERSHIP_CACHE_NEGATIVE_TTL", 30)),
+            refresh_ahead=float(config("MEMBERSHIP_CACHE_REFRESH_AHEAD", 300)),
+        )
+        self.tokens_menu_cache = TokensMenuCache(int(config("TOKENS_MENU_CACHE_CAPACITY", 512)))
+        self.last_channel_tick_stats: Tuple[int, int, int] = (0, 0, 0)  # due channels, renders, renders saved
         self.last_daily_check: int | None = None
         BotSettings.init()
 
@@ -561,10 +585,7 @@ class BotMan:
 
     @staticmethod
     def actionCallbackData(action: QueryActions, value: any, page: int | None = None):
-        data = {"act": action.value, "v": value}
-        if page is not None:
-            data["pg"] = page
-        return jsonify(data)
+        return CallbackData.action(action.value, value, page)
 
     @staticmethod
     def inlineKeyboardChoiceCallbackData(
@@ -573,14 +594,7 @@ class BotMan:
         value: str | int | float | bool | None = None,
         page: int = 0,
     ):
-        return jsonify(
-            {
-                "lt": list_type.value if list_type else None,
-                "bt": button_type.value,
-                "pg": page,
-                "v": value,
-            }
-        )
+        return CallbackData.choice(list_type.value if list_type else None, button_type.value, value, page)
 
     def create_tokens_menu(
         self,
@@ -595,10 +609,44 @@ class BotMan:
         choices_start_offset: int = 0,
     ):
         """this function creates inline keyboard for selecting/deselecting some options"""
-        if not selected_ones:
-            selected_ones = []
-        buttons: List[List[InlineKeyboardButton]] = []
-        pagination_menu: List[InlineKeyboardButton] | None = None
+        rows = self.tokens_menu_cache.get(
+            (
+                list_type.value if list_type else None,
+                button_type.value,
+                language,
+                page,
+                max_page_buttons,
+                close_button,
+                choices_start_offset,
+            ),
+            choices_fa,
+            lambda: self.build_tokens_menu_rows(
+                list_type,
+                button_type,
+                choices_fa,
+                page,
+                max_page_buttons,
+                close_button,
+                language,
+                choices_start_offset,
+            ),
+        )
+        return TokensMenuCache.overlay(rows, selected_ones)
+
+    def build_tokens_menu_rows(
+        self,
+        list_type: Enum,
+        button_type: Enum,
+        choices_fa: Dict[str, str],
+        page: int = 0,
+        max_page_buttons: int = 90,
+        close_button: bool = False,
+        language: str = "fa",
+        choices_start_offset: int = 0,
+    ) -> TokensMenuRows:
+        """Button grid of the tokens menu, without any selection marks."""
+        buttons: TokensMenuRows = []
+        pagination_menu: List[Tuple[None, InlineKeyboardButton]] | None = None
         buttons_count = len(choices_fa)
 
         if buttons_count > max_page_buttons:
@@ -609,39 +657,41 @@ class BotMan:
             pages_count = int(buttons_count / max_page_buttons)
             choice_keys = list(choices_fa.keys())[(idx_first if idx_first else choices_start_offset) : idx_last]
             pagination_menu = [
-                InlineKeyboardButton(
-                    "<<",
-                    callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, page=0),
-                ),
-                InlineKeyboardButton(
-                    "<",
-                    callback_data=BotMan.inlineKeyboardChoiceCallbackData(
-                        list_type, button_type, page=page - 1 if page > 0 else 0
+                (None, button)
+                for button in (
+                    InlineKeyboardButton(
+                        "<<",
+                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, page=0),
                     ),
-                ),
-                InlineKeyboardButton(
-                    (f"({pages_count+1}/{page+1})" if language != "fa" else persianify(f"({pages_count+1}/{page+1})")),
-                    callback_data=jsonify(
-                        {
-                            "lt": list_type.value if list_type else None,
-                            "bt": button_type.value,
-                            "pg": page,
-                            "v": f"$#{idx_first}:{idx_last}",
-                        }
+                    InlineKeyboardButton(
+                        "<",
+                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(
+                            list_type, button_type, page=page - 1 if page > 0 else 0
+                        ),
                     ),
-                ),
-                InlineKeyboardButton(
-                    ">",
-                    callback_data=BotMan.inlineKeyboardChoiceCallbackData(
-                        list_type,
-                        button_type,
-                        page=page + 1 if page < pages_count else pages_count,
+                    InlineKeyboardButton(
+                        (
+                            f"({pages_count+1}/{page+1})"
+                            if language != "fa"
+                            else persianify(f"({pages_count+1}/{page+1})")
+                        ),
+                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(
+                            list_type, button_type, f"$#{idx_first}:{idx_last}", page
+                        ),
                     ),
-                ),
-                InlineKeyboardButton(
-                    ">>",
-                    callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, page=pages_count),
-                ),
+                    InlineKeyboardButton(
+                        ">",
+                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(
+                            list_type,
+                            button_type,
+                            page=page + 1 if page < pages_count else pages_count,
+                        ),
+                    ),
+                    InlineKeyboardButton(
+                        ">>",
+                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, page=pages_count),
+                    ),
+                )
             ]
         else:
             choice_keys = (
@@ -649,7 +699,7 @@ class BotMan:
             )
 
         row_length: int = 0
-        row: List[InlineKeyboardButton] = []
+        row: List[Tuple[str, InlineKeyboardButton]] = []
         for choice in choice_keys:
             btn_text = (
                 (
@@ -661,12 +711,13 @@ class BotMan:
                 else choices_fa[choice]
             )
             row_length += 1 + int(len(btn_text) / 5)
-            if choice in selected_ones:
-                btn_text += "✅"
             row.append(
-                InlineKeyboardButton(
-                    btn_text,
-                    callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, choice, page),
+                (
+                    choice,
+                    InlineKeyboardButton(
+                        btn_text,
+                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, choice, page),
+                    ),
                 )
             )
             if row_length >= 5:
@@ -682,13 +733,16 @@ class BotMan:
         if close_button:
             buttons.append(
                 [
-                    InlineKeyboardButton(
-                        self.resourceman.keyboard("close", language),
-                        callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, page=-1),
+                    (
+                        None,
+                        InlineKeyboardButton(
+                            self.resourceman.keyboard("close", language),
+                            callback_data=BotMan.inlineKeyboardChoiceCallbackData(list_type, button_type, page=-1),
+                        ),
                     )
                 ]
             )
-        return InlineKeyboardMarkup(buttons)
+        return buttons
 
     def inline_url(
         self,
@@ -882,6 +936,10 @@ class BotMan:
         return ReplyKeyboardMarkup(buttons, resize_keyboard=True)
 
     async def has_subscribed_us(self, chat_id: int, context: CallbackContext) -> bool:
+        """Check if the user is a member of our channels; results are cached, see MembershipCache."""
+        return await self.membership_cache.check(chat_id, lambda user_id: self.check_membership(user_id, context))
+
+    async def check_membership(self, chat_id: int, context: CallbackContext) -> bool:
         try:
             chat1, chat2 = await asyncio.gather(
                 context.bot.get_chat_member(self.channels[0]["id"], chat_id),
@@ -938,50 +996,78 @@ class BotMan:
     async def next_post(self, language: str = "fa"):
         return await self.postman.create_post(post_interval=self.main_plan_interval, language=language)
 
-    async def update_markets(self):
-        try:
-            await self.currency_serv.update()
-        except Exception as ex:
-            log("CurrencyAPI failed:", ex, self.currency_serv.Source)
+    async def update_market_source(self, service: CurrencyService | CryptoCurrencyService) -> bool:
+        """Update a single price source within its own deadline. On failure the service keeps its previous snapshot; on timeout
+        the update goes on in the background and the previous snapshot is served until it's done. Price history & the warm
+        start snapshot are recorded by the service update listeners, so late updates are recorded too."""
+        start_time = time()
+        stats = self.market_update_stats.setdefault(service.Source, {"ok": 0, "failed": 0, "timeouts": 0, "last_duration": 0.0})
         try:
-            await self.crypto_serv.update()
+            if not (await asyncio.wait_for(service.update_once(), timeout=self.market_source_deadline)):
+                stats["failed"] += 1
+                return False  # the service has logged the failure itself
+            stats["ok"] += 1
+            return True
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            log(
+                f"{service.Source} update exceeded {self.market_source_deadline}s deadline; "
+                "previous prices are served until it finishes in the background.",
+                category_name=service.Source,
+            )
         except Exception as ex:
-            log("CryptocurrencyAPI failed:", ex, self.crypto_serv.Source)
+            stats["failed"] += 1
+            log(f"{service.Source} update failed:", ex, service.Source)
+        finally:
+            stats["last_duration"] = time() - start_time
+        return False
 
-    def is_alarm_triggered(self, alarm: PriceAlarm) -> bool:
-        try:
-            alarm.current_price = (
-                self.crypto_serv if alarm.market == MarketOptions.CRYPTO else self.currency_serv
-            ).get_single_price(alarm.token, alarm.target_unit)
-            if alarm.current_price is not None:
-                match alarm.change_direction:
-                    case PriceAlarm.ChangeDirection.UP:
-                        return alarm.current_price >= alarm.target_price
-                    case PriceAlarm.ChangeDirection.DOWN:
-                        return alarm.current_price <= alarm.target_price
-                    case _:
-                        return alarm.current_price == alarm.target_price
+    async def update_markets(self) -> bool:
+        """Update all price sources concurrently; Returns True if at least one of the sources were updated."""
+        tasks = [
+            asyncio.create_task(self.update_market_source(service))
+            for service in (self.currency_serv, self.crypto_serv)
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=self.market_update_deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            log(
+                f"{len(pending)} market sources exceeded the total {self.market_update_deadline}s update deadline.",
+                category_name="MarketUpdate",
+            )
+        return any(task.result() for task in done if not task.cancelled())
 
+    def get_alarm_current_price(self, market: MarketOptions, token: str, price_unit: str) -> float | int | None:
+        try:
+            return (self.crypto_serv if market == MarketOptions.CRYPTO else self.currency_serv).get_single_price(
+                token, price_unit
+            )
         except Exception as x:
             log(
-                f"Failed examining Alarm state: id={alarm.id} account={alarm.chat_id}: {alarm}",
+                f"Failed examining alarms state of {token} in {price_unit}:",
                 x,
                 category_name="Alarm",
             )
-        return False
+        return None
 
     async def handle_possible_alarms(self, bot_ctx: CallbackContext):
-        """Checks all user alarms and finds alarms that have been triggered"""
-        triggered_alarms = list(filter(lambda alarm: self.is_alarm_triggered(alarm), PriceAlarm.get()))
-        # TODO: Now that there's a pre_latest_data, check for currencies that have changed in 10m and then get alarms by currencies
-        if not triggered_alarms:
+        """Finds the alarms that have been triggered, using the resident alarms index"""
+        triggered_alarms = PriceAlarm.index().triggered(self.get_alarm_current_price)
+        if not triggered_alarms or not (triggered_alarms := PriceAlarm.dropStale(triggered_alarms)):
             return
-        await asyncio.gather(*[self.trigger_alarm(alarm, bot_ctx, auto_disable=False) for alarm in triggered_alarms])
+        owners = Account.getByIds({alarm.chat_id for alarm in triggered_alarms})
+        for alarm in triggered_alarms:
+            alarm.owner = owners.get(alarm.chat_id)
+        # alarms whose owners do not exist anymore are not notified, just removed with the rest
+        await asyncio.gather(
+            *[self.trigger_alarm(alarm, bot_ctx, auto_disable=False) for alarm in triggered_alarms if alarm.owner]
+        )
         PriceAlarm.batchDisable(triggered_alarms)
 
     async def trigger_alarm(self, alarm: PriceAlarm, bot_ctx: CallbackContext, auto_disable: bool = True):
         try:
-            account = Account.getById(alarm.chat_id, no_fastmem=True)
+            account = alarm.owner or Account.getById(alarm.chat_id, no_fastmem=True)
             currency_name, unit_name, current_price = (
                 (
                     alarm.token.upper(),
@@ -1005,7 +1091,9 @@ class BotMan:
                 unit_name,
             )
 
-            await bot_ctx.bot.send_message(chat_id=account.chat_id, text=price_alarm_text)
+            await bot_ctx.bot.send_message(
+                chat_id=account.chat_id, text=price_alarm_text, rate_limit_args=SendPriority.ALARM
+            )
             if auto_disable:
                 alarm.disable()
         except Forbidden:  # User had blocked the bot.
@@ -1068,7 +1156,7 @@ class BotMan:
         )
 
     async def show_settings_menu(self, update: Update):
-        account = Account.get(update.message.chat)
+        account = await Account.getAsync(update.message.chat)
         keyboard = ReplyKeyboardMarkup(
             (
                 [
@@ -1126,7 +1214,7 @@ class BotMan:
         only_menu: bool = False,
     ) -> InlineKeyboardMarkup | None:
         try:
-            account = Account.get(update.message.chat)
+            account = await Account.getAsync(update.message.chat)
             premiums = Account.getPremiumUsers()
             if not premiums:
                 if not only_menu:
@@ -1192,34 +1280,38 @@ class BotMan:
             pass
         return 1
 
+    @property
+    def symbol_sources(self) -> List[Tuple[Dict[str, str] | None, bool, MarketOptions]]:
+        """Symbol name tables in the order they are matched; the slug itself is checked only in the main tables."""
+        return [
+            (self.crypto_serv.coinsInPersian, True, MarketOptions.CRYPTO),
+            (self.crypto_serv.persianShortcuts, False, MarketOptions.CRYPTO),
+            (self.currency_serv.currenciesInPersian, True, MarketOptions.CURRENCY),
+            (self.currency_serv.persianShortcuts, False, MarketOptions.CURRENCY),
+            (self.currency_serv.goldsInEnglish, False, MarketOptions.CURRENCY),
+        ]
+
+    @property
+    def symbol_matcher(self) -> SymbolTrie:
+        """The symbol trie, which is rebuilt only when the name tables change."""
+        if not self.symbol_trie or self.symbol_trie.is_outdated(APIService.symbolNamesVersion):
+            self.symbol_trie = SymbolTrie(self.symbol_sources, APIService.symbolNamesVersion)
+        return self.symbol_trie
+
     def extract_symbols_and_amounts(self, text: str) -> Tuple[Set[str], Set[str]]:
         words = text.split()
         crypto_amounts = set()
         currency_amounts = set()
 
-        finder = OptiFinder(words)
+        matcher = self.symbol_matcher
+        words_count = len(words)
         i = 0
 
-        while i < finder.word_count:
-            prev_word: str | float = words[i - 1] if i else 1.0
-            slug, word_count = finder.search_around(self.crypto_serv.coinsInPersian, i)
-            if not slug:
-                slug, word_count = finder.search_around(
-                    self.crypto_serv.persianShortcuts, i, check_slug=False
-                )  # since slugs are checked in previous call
+        while i < words_count:
+            slug, word_count, market = matcher.search(words, i)
             if slug:
-                multiplier = BotMan.extractMultiplier(prev_word)
-                crypto_amounts.add(f"{multiplier} {slug}")
-            else:
-                slug, word_count = finder.search_around(self.currency_serv.currenciesInPersian, i)
-
-                if not slug:
-                    slug, word_count = finder.search_around(self.currency_serv.persianShortcuts, i, check_slug=False)
-                    if not slug:
-                        slug, word_count = finder.search_around(self.currency_serv.goldsInEnglish, i, check_slug=False)
-                if slug:
-                    multiplier = BotMan.extractMultiplier(prev_word)
-                    currency_amounts.add(f"{multiplier} {slug}")
+                multiplier = BotMan.extractMultiplier(words[i - 1] if i else 1.0)
+                (crypto_amounts if market == MarketOptions.CRYPTO else currency_amounts).add(f"{multiplier} {slug}")
             i += word_count
         return crypto_amounts, currency_amounts
 
@@ -1417,7 +1509,7 @@ class BotMan:
     async def handle_set_interval_outcome(
         self, update: Update | CallbackQuery, context: CallbackContext, interval: int
     ):
-        account = Account.get(update.message.chat)
+        account = await Account.getAsync(update.message.chat)
         channel_id = account.get_cache("channel_chat_id")
         try:
             if account.state == Account.States.SELECT_POST_INTERVAL:
@@ -1561,18 +1653,20 @@ class BotMan:
         channel: Channel,
         context: CallbackContext,
         update_last_post_time_targets: List[int],
+        rendered_bodies: Dict[tuple, str] | None = None,
     ):
-        owner = Account.getById(channel.owner_id, no_fastmem=True)  # TODO: Implement SQL-JOIN for fast owner loading.
+        owner = channel.owner or Account.getById(channel.owner_id, no_fastmem=True)
         if not owner.is_premium:
             return  # TODO: Maybe Deactivate the channel? or inform users of their premium plan ending?
         try:
-            post = self.postman.create_channel_post(channel)
-            await context.bot.send_message(chat_id=channel.id, text=post)
+            post = self.postman.create_channel_post(channel, rendered_bodies)
+            await context.bot.send_message(chat_id=channel.id, text=post, rate_limit_args=SendPriority.CHANNEL)
             update_last_post_time_targets.append(channel.id)
         except Forbidden:
             await context.bot.send_message(
                 chat_id=owner.chat_id,
                 text=self.error("bot_was_kicked_from_your_channel", owner.language),
+                rate_limit_args=SendPriority.CHANNEL,
             )
         except Exception as x:
             log(
@@ -1583,27 +1677,52 @@ class BotMan:
 
     async def process_channels(self, context: CallbackContext):
         """loop through channels and send post in ones that their interval due has reached."""
-        channels = Channel.actives()
+        Account.flushDirty(only_if_due=True)  # this job is the periodic flusher of account write-behind queue
         now = now_in_minute()
+        channel_queue = Channel.queue()
+        channels = channel_queue.pop_due(now)
+        if not channels:
+            return
 
-        update_last_post_time_targets = []
-        post_tasks: list[Coroutine[Any, Any, None]] = []
+        # fresh owner state (such as plan changes), read from database by one query for all due channels;
+        # only the owners with queued changes, not written yet, are taken from memory
+        owners = Account.getByIds({channel.owner_id for channel in channels}, fresh=True)
         for channel in channels:
-            if not channel.last_post_time or (now - channel.last_post_time >= channel.interval):
-                post_tasks.append(self.handle_channel_posting(channel, context, update_last_post_time_targets))
-        await asyncio.gather(*post_tasks)
+            channel.owner = owners.get(channel.owner_id)
+
+        update_last_post_time_targets = []
+        rendered_bodies: Dict[tuple, str] = {}  # all due channels are posted on the same prices, so same bodies are shared
+        reuses_before = self.postman.channel_post_reuses
+        post_tasks: list[Coroutine[Any, Any, None]] = [
+            self.handle_channel_posting(channel, context, update_last_post_time_targets, rendered_bodies)
+            for channel in channels
+        ]
+        try:
+            await asyncio.gather(*post_tasks)
+        finally:
+            channel_queue.requeue(channels, update_last_post_time_targets, now)
+        self.last_channel_tick_stats = (
+            len(channels),
+            len(rendered_bodies),
+            self.postman.channel_post_reuses - reuses_before,
+        )
         if update_last_post_time_targets:
             Channel.updateLastPostTimes(update_last_post_time_targets)
 
     async def downgrade_user(self, user: Account, context: CallbackContext | None = None):
         user.downgrade()
         if context:
-            await context.bot.send_message(chat_id=user.chat_id, text=self.text("plan_expired", user.language))
+            await context.bot.send_message(
+                chat_id=user.chat_id,
+                text=self.text("plan_expired", user.language),
+                rate_limit_args=SendPriority.BROADCAST,
+            )
         Channel.deactivateUserChannels(user.chat_id)
 
     async def do_hourly_check(self, context: CallbackContext):
         """Garbage collect fast mems, remove messages supposed to be removed, etc."""
         Account.garbageCollect()
+        Account.flushDirty()
         Group.garbageCollect()
         if not self.last_daily_check or now_in_minute() - self.last_daily_check >= 1440:
             await self.do_daily_checks(context)
@@ -1630,6 +1749,7 @@ class BotMan:
                             context.bot.send_message(
                                 chat_id=user.chat_id,
                                 text=self.text("premium_expiry_is_close", user.language) % (days_remaining,),
+                                rate_limit_args=SendPriority.BROADCAST,
                             )
                         )
             except Exception as x:
@@ -1644,7 +1764,11 @@ class BotMan:
                 try:
                     (_, chat_id, msg_id) = msg
                     if chat_id and msg_id:
-                        async_tasks.append(context.bot.delete_message(chat_id=int(chat_id), message_id=int(msg_id)))
+                        async_tasks.append(
+                            context.bot.delete_message(
+                                chat_id=int(chat_id), message_id=int(msg_id), rate_limit_args=SendPriority.BROADCAST
+                            )
+                        )
                 except Exception as x:
                     log("Failed removing sent post:", x, category_name="DailyJobs")
             db.throw_away_messages_passed_time(from_time=now)
@@ -1658,7 +1782,7 @@ class BotMan:
 
     @staticmethod
     def refreshMemory():
-        Account.fastMemInstances.clear()
+        Account.fastMem().clear()
         BotSettings.refresh()  # this one calls gc.collect too
 
     @staticmethod
@@ -1725,6 +1849,48 @@ class BotMan:
         )
         return total_report, interaction_report
 
+    async def startup(self):
+        await SessionManager.start()
+        await AsyncDatabaseInterface.get().run(PriceAlarm.index)  # load the alarm index without blocking the loop
+
+    async def shutdown(self):
+        Account.flushDirty()
+        self.postman.save_warm_start()
+        CacheWriter.get().shutdown()
+        self.postman.crypto_history.shutdown()
+        self.postman.currency_history.shutdown()
+        await SessionManager.close()
+        AsyncDatabaseInterface.get().shutdown()
+
+    def collect_performance_stats(self) -> List[str]:
+        """Runtime counters of the performance related components, each as a separate report."""
+        market_report = "\n".join(
+            f"{source}: OK={stats['ok']}, Failed={stats['failed']}, Timeouts={stats['timeouts']}, Last Duration={stats['last_duration']:.2f}s"
+            for source, stats in self.market_update_stats.items()
+        )
+        reports = [
+            SessionManager.report(),
+            market_report or "No market updates yet.",
+            f"{self.currency_serv.single_flight_report}\n{self.crypto_serv.single_flight_report}",
+            f"{self.currency_serv.rows_report}\n{self.crypto_serv.rows_report}",
+            self.postman.warm_start.report,
+            CacheWriter.get().report,
+            f"{self.postman.currency_history.report}\n{self.postman.crypto_history.report}",
+            self.outbox.report,
+            Account.fastMem().report,
+            Group.cache().report,
+            self.membership_cache.report,
+            self.tokens_menu_cache.report,
+            Account.writeBehindReport(),
+            AsyncDatabaseInterface.get().report,
+            "Channel Posts: Renders={}, Saved Renders={}\nLast Tick: Due Channels={}, Renders={}, Saved={}".format(
+                self.postman.channel_post_renders, self.postman.channel_post_reuses, *self.last_channel_tick_stats
+            ),
+        ]
+        if hasattr(self.crypto_serv, "report"):
+            reports.append(self.crypto_serv.report)
+        return reports
+
     def get_token_state(self, market: MarketOptions, token: str, price_unit: str):
         current_price: float
         currency_name: str
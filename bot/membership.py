@@ -0,0 +1,79 @@
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable, Dict, Tuple
+import asyncio
+from tools.manuwriter import log
+
+
+class MembershipCache:
+    """Results of the forced channel membership checks per user. Positive results are kept for a long TTL and
+    negative ones for a short TTL; a positive entry close to its expiry is served while being refreshed in background."""
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        negative_ttl: float = 30.0,
+        refresh_ahead: float = 300.0,
+        capacity: int = 100000,
+    ) -> None:
+        self.ttl = ttl  # all in seconds
+        self.negative_ttl = negative_ttl
+        self.refresh_ahead = refresh_ahead
+        self.capacity = capacity
+        self.entries: Dict[int, Tuple[bool, float]] = {}  # chat_id => (is member, expiry time)
+        self.refreshing: Dict[int, asyncio.Task] = {}
+
+        # statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.refreshes: int = 0
+        self.checks: int = 0
+        self.total_check_time: float = 0.0
+
+    async def check(self, chat_id: int, checker: Callable[[int], Awaitable[bool]]) -> bool:
+        now = monotonic()
+        entry = self.entries.get(chat_id)
+        if entry is not None and entry[1] > now:
+            self.hits += 1
+            if entry[0] and entry[1] - now < self.refresh_ahead and chat_id not in self.refreshing:
+                self.refreshing[chat_id] = asyncio.create_task(self.refresh_in_background(chat_id, checker))
+            return entry[0]
+        self.misses += 1
+        return await self.refresh(chat_id, checker)
+
+    async def refresh(self, chat_id: int, checker: Callable[[int], Awaitable[bool]]) -> bool:
+        started_at = perf_counter()
+        is_member = await checker(chat_id)
+        self.checks += 1
+        self.total_check_time += perf_counter() - started_at
+
+        now = monotonic()
+        self.entries[chat_id] = (is_member, now + (self.ttl if is_member else self.negative_ttl))
+        if len(self.entries) > self.capacity:
+            self.prune(now)
+        return is_member
+
+    async def refresh_in_background(self, chat_id: int, checker: Callable[[int], Awaitable[bool]]):
+        try:
+            self.refreshes += 1
+            await self.refresh(chat_id, checker)
+        except Exception as x:
+            log(f"Failed refreshing channel membership of {chat_id}", x, category_name="Membership")
+        finally:
+            self.refreshing.pop(chat_id, None)
+
+    def invalidate(self, chat_id: int):
+        self.entries.pop(chat_id, None)
+
+    def prune(self, now: float):
+        for chat_id in [chat_id for chat_id, (_, expiry) in self.entries.items() if expiry <= now]:
+            del self.entries[chat_id]
+
+    @property
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        average_check_time = self.total_check_time / self.checks if self.checks else 0.0
+        return (
+            f"Membership Cache: Size={len(self.entries)}, Hits={self.hits}, Misses={self.misses}, "
+            f"Hit Rate={(self.hits / lookups if lookups else 0) * 100:.1f}%, Background Refreshes={self.refreshes}\n"
+            f"Avg Check Latency={average_check_time * 1000:.0f}ms, Latency Saved~{self.hits * average_check_time:.1f}s"
+        )
@@ -0,0 +1,235 @@
+from enum import Enum
+from heapq import heappush, heappop
+from itertools import count
+from typing import Any, Callable, Coroutine, Dict, List, Tuple
+from datetime import timedelta
+import asyncio
+from telegram.ext import BaseRateLimiter
+from telegram.error import RetryAfter
+from tools.manuwriter import log
+
+
+class SendPriority(Enum):
+    """Priority classes of outgoing requests; lower value is sent first."""
+
+    INTERACTIVE = 0  # direct replies to users
+    ALARM = 1
+    CHANNEL = 2
+    BROADCAST = 3
+
+
+class Outbox(BaseRateLimiter):
+    """Central rate limiter of all bot requests sent to a chat; it consists of a global token bucket,
+    a token bucket per chat, and a priority queue which decides who gets the next token. Only the requests that send
+    a message are paced; the rest (getChatMember, editMessageText, deleteMessage, ...) are called directly.
+    Pass a SendPriority as rate_limit_args to bot methods to set the priority class; default is INTERACTIVE."""
+
+    # endpoints which post a new message into a chat, so count against telegram flood limits
+    sendingEndpoints = frozenset(
+        (
+            "sendMessage",
+            "copyMessage",
+            "forwardMessage",
+            "sendPhoto",
+            "sendDocument",
+            "sendVideo",
+            "sendAnimation",
+            "sendAudio",
+            "sendVoice",
+            "sendVideoNote",
+            "sendMediaGroup",
+            "sendSticker",
+            "sendLocation",
+            "sendVenue",
+            "sendContact",
+            "sendPoll",
+            "sendDice",
+            "sendInvoice",
+        )
+    )
+
+    def __init__(
+        self,
+        messages_per_second: float = 30.0,
+        private_chat_rate: float = 1.0,
+        group_chat_rate: float = 20 / 60,
+        chat_burst: int = 3,
+        max_retries: int = 3,
+    ) -> None:
+        self.rate = messages_per_second
+        self.capacity = messages_per_second
+        self.tokens = messages_per_second
+        self.last_refill: float = 0.0
+        self.private_chat_rate = private_chat_rate
+        self.group_chat_rate = group_chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.paused_until: float = 0.0
+
+        self.chat_buckets: Dict[int | str, List[float]] = {}  # chat_id => [tokens, last refill time]
+        self.waiting: List[Tuple[int, int, int | str, asyncio.Future]] = []
+        self.sequence = count()
+        self.wakeup: asyncio.Event | None = None
+        self.dispatcher: asyncio.Task | None = None
+
+        # statistics
+        self.max_queue_depth: int = 0
+        self.retry_afters: int = 0
+        self.failures: int = 0
+        self.sent: Dict[SendPriority, int] = {priority: 0 for priority in SendPriority}
+        self.total_wait: Dict[SendPriority, float] = {priority: 0.0 for priority in SendPriority}
+        self.total_latency: Dict[SendPriority, float] = {priority: 0.0 for priority in SendPriority}
+
+    async def initialize(self) -> None:
+        self.ensure_dispatcher()
+
+    async def shutdown(self) -> None:
+        if self.dispatcher and not self.dispatcher.done():
+            self.dispatcher.cancel()
+            try:
+                await self.dispatcher
+            except asyncio.CancelledError:
+                pass
+        self.dispatcher = None
+        for *_, future in self.waiting:
+            if not future.done():
+                future.cancel()
+        self.waiting.clear()
+
+    def ensure_dispatcher(self):
+        if self.dispatcher is None or self.dispatcher.done():
+            self.wakeup = asyncio.Event()
+            self.last_refill = asyncio.get_running_loop().time()
+            self.dispatcher = asyncio.create_task(self.dispatch())
+
+    @staticmethod
+    def isGroupChat(chat_id: int | str) -> bool:
+        return isinstance(chat_id, str) or chat_id < 0
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def chat_wait_time(self, chat_id: int | str, now: float) -> float:
+        """Refill the chat bucket and return how long it takes to have a token in it."""
+        rate = self.group_chat_rate if Outbox.isGroupChat(chat_id) else self.private_chat_rate
+        if not (bucket := self.chat_buckets.get(chat_id)):
+            bucket = self.chat_buckets[chat_id] = [float(self.chat_burst), now]
+        bucket[0] = min(self.chat_burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        return 0.0 if bucket[0] >= 1 else (1 - bucket[0]) / rate
+
+    def prune_chat_buckets(self, now: float):
+        """Forget idle chats, which their buckets are full again."""
+        for chat_id in list(self.chat_buckets):
+            if self.chat_wait_time(chat_id, now) == 0.0 and self.chat_buckets[chat_id][0] >= self.chat_burst:
+                del self.chat_buckets[chat_id]
+
+    def grant_next(self, now: float, scan_limit: int = 100) -> float:
+        """Give a token to the most prior waiting request, whose chat is ready; returns the time to wait if none was ready."""
+        skipped = []
+        min_wait: float | None = None
+        try:
+            while self.waiting and len(skipped) < scan_limit:
+                entry = heappop(self.waiting)
+                future = entry[-1]
+                if future.done():
+                    continue  # caller is cancelled
+                if (wait := self.chat_wait_time(entry[2], now)) > 0:
+                    skipped.append(entry)
+                    min_wait = wait if min_wait is None else min(min_wait, wait)
+                    continue
+                self.chat_buckets[entry[2]][0] -= 1
+                self.tokens -= 1
+                future.set_result(None)
+                return 0.0
+        finally:
+            for entry in skipped:
+                heappush(self.waiting, entry)
+        return min_wait or 0.0
+
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if not self.waiting:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+                now = loop.time()
+                if (delay := self.paused_until - now) <= 0:
+                    self.refill(now)
+                    delay = (1 - self.tokens) / self.rate if self.tokens < 1 else self.grant_next(now)
+                    if len(self.chat_buckets) > 10000:
+                        self.prune_chat_buckets(now)
+                if delay <= 0:
+                    continue
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as x:
+                log("Outbox dispatcher failure:", x, category_name="Outbox")
+
+    async def acquire(self, chat_id: int | str, priority: SendPriority):
+        self.ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        heappush(self.waiting, (priority.value, next(self.sequence), chat_id, future))
+        if len(self.waiting) > self.max_queue_depth:
+            self.max_queue_depth = len(self.waiting)
+        self.wakeup.set()
+        await future
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: SendPriority | None,
+    ):
+        chat_id = data.get("chat_id") if data else None
+        if chat_id is None or endpoint not in Outbox.sendingEndpoints:
+            return await callback(*args, **kwargs)  # such as getUpdates, getChatMember or answerCallbackQuery
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):
+            pass
+        priority = rate_limit_args if isinstance(rate_limit_args, SendPriority) else SendPriority.INTERACTIVE
+        loop = asyncio.get_running_loop()
+        retries = 0
+        while True:
+            queued_at = loop.time()
+            await self.acquire(chat_id, priority)
+            sent_at = loop.time()
+            try:
+                result = await callback(*args, **kwargs)
+                self.sent[priority] += 1
+                self.total_wait[priority] += sent_at - queued_at
+                self.total_latency[priority] += loop.time() - sent_at
+                return result
+            except RetryAfter as ex:
+                self.retry_afters += 1
+                retry_after = ex.retry_after.total_seconds() if isinstance(ex.retry_after, timedelta) else ex.retry_after
+                self.paused_until = max(self.paused_until, loop.time() + float(retry_after) + 0.1)
+                retries += 1
+                if retries > self.max_retries:
+                    self.failures += 1
+                    raise
+                log(f"Flood limit reached on {endpoint}; retrying after {retry_after}s.", category_name="Outbox")
+
+    @property
+    def report(self) -> str:
+        rows = [f"Outbox Queue Depth: {len(self.waiting)} (Max: {self.max_queue_depth})"]
+        for priority in SendPriority:
+            if sent := self.sent[priority]:
+                rows.append(
+                    f"{priority.name}: Sent={sent}, Avg Wait={self.total_wait[priority] / sent:.2f}s, "
+                    f"Avg Latency={self.total_latency[priority] / sent:.2f}s"
+                )
+        rows.append(f"RetryAfters: {self.retry_afters}, Failures: {self.failures}")
+        return "\n".join(rows)
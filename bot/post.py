@@ -2,9 +2,14 @@ from tools.mathematix import timestamp, persianify
 from tools.manuwriter import log
 from api.crypto_service import CoinGeckoService, CoinMarketCapService
 from api.currency_service import NavasanService
+from api.warm_start import WarmStartSnapshot
+from api.price_history import PriceHistory
+from api.base import APIService, BaseAPIService
+from decouple import config
 from models.group import Group
 from models.channel import Channel
 from bot.types import ResourceManager
+from typing import Dict, Tuple
 
 
 class PostMan:
@@ -35,6 +40,35 @@ class PostMan:
         )
         self.crypto_service.load_cache()
         self.currency_service.load_cache()
+        self.warm_start = WarmStartSnapshot()
+        self.warm_start.restore(self.currency_service, self.crypto_service)
+        history_options = {
+            "folder": f"./{BaseAPIService.cacheFolderPath}/history",
+            "capacity": int(config("PRICE_HISTORY_CAPACITY", 1440)),
+            "segment_seconds": int(float(config("PRICE_HISTORY_SEGMENT_HOURS", 6)) * 3600),
+            "max_segments": int(config("PRICE_HISTORY_MAX_SEGMENTS", 28)),
+        }
+        self.crypto_history = PriceHistory("crypto", **history_options)  # in usd
+        self.currency_history = PriceHistory("currency", **history_options)  # in tomans
+        self.crypto_service.update_listeners.append(self.on_service_updated)
+        self.currency_service.update_listeners.append(self.on_service_updated)
+        # channel post render statistics
+        self.channel_post_renders: int = 0
+        self.channel_post_reuses: int = 0
+
+    def record_price_history(self, service: APIService) -> bool:
+        history = self.crypto_history if service is self.crypto_service else self.currency_history
+        # the conversion vector has all prices of a service in one unit, i.e. currencies priced in usd are in tomans too
+        return history.record(service.conversion_vector(), service.snapshot_version)
+
+    def on_service_updated(self, service: APIService):
+        """Called whenever an update of the service is done, including the ones finished after a market update deadline."""
+        if isinstance(service.latest_data, dict):
+            self.record_price_history(service)
+        self.save_warm_start()
+
+    def save_warm_start(self) -> bool:
+        return self.warm_start.save(self.currency_service, self.crypto_service)
 
     def arrange_post_sections(
         self, fiat_body: str, gold_body: str, crypto_body: str, post_interval: float | None = None, language: str = "fa"
@@ -98,33 +132,44 @@ class PostMan:
             cryptos = self.crypto_service.get_latest(desired_coins, language, no_price_message)
         return self.arrange_post_sections(fiat, gold, cryptos, post_interval=post_interval, language=language)
 
-    def create_channel_post(self, channel: Channel):
+    @staticmethod
+    def channelRenderKey(channel: Channel) -> Tuple[Tuple[str, ...], Tuple[str, ...], str, bool]:
+        """Channels with the same render key, share the same post body."""
+        return (
+            tuple(channel.selected_coins or ()),
+            tuple(channel.selected_currencies or ()),
+            channel.language,
+            bool(channel.message_show_market_tags),
+        )
+
+    def create_channel_post_body(
+        self, selected_coins: Tuple[str, ...], selected_currencies: Tuple[str, ...], language: str, show_market_tags: bool
+    ) -> str:
         fiat = gold = crypto = ""
-        no_price_message = self.get_default_no_price_message(channel.language)
+        selected_coins, selected_currencies = list(selected_coins), list(selected_currencies)
+        no_price_message = self.get_default_no_price_message(language)
 
         try:
-            if channel.selected_currencies or not channel.selected_coins:
+            if selected_currencies or not selected_coins:
                 # this condition is for preventing default values, when user has selected just cryptos
-                fiat, gold = self.currency_service.get_latest(
-                    channel.selected_currencies, channel.language, no_price_message
-                )
+                fiat, gold = self.currency_service.get_latest(selected_currencies, language, no_price_message)
         except:
-            if channel.selected_currencies and not fiat and not gold:
-                fiat = self.resourceman.error("failed_getting_currency_market", channel.language)
+            if selected_currencies and not fiat and not gold:
+                fiat = self.resourceman.error("failed_getting_currency_market", language)
 
         try:
-            if channel.selected_coins or not channel.selected_currencies:
-                crypto = self.crypto_service.get_latest(channel.selected_coins, channel.language, no_price_message)
+            if selected_coins or not selected_currencies:
+                crypto = self.crypto_service.get_latest(selected_coins, language, no_price_message)
         except Exception as ex:
-            if channel.selected_coins and not crypto:
-                crypto = self.resourceman.error("failed_getting_crypto_market", channel.language)
+            if selected_coins and not crypto:
+                crypto = self.resourceman.error("failed_getting_crypto_market", language)
 
         post = ""
         tags_fiat = tags_gold = tags_crypto = ""
-        if channel.message_show_market_tags:
-            tags_fiat = self.resourceman.text("announcement_fiat_header", channel.language) + "\n"
-            tags_gold = self.resourceman.text("announcement_gold_header", channel.language) + "\n"
-            tags_crypto = self.resourceman.text("announcement_crypto_header", channel.language) + "\n"
+        if show_market_tags:
+            tags_fiat = self.resourceman.text("announcement_fiat_header", language) + "\n"
+            tags_gold = self.resourceman.text("announcement_gold_header", language) + "\n"
+            tags_crypto = self.resourceman.text("announcement_crypto_header", language) + "\n"
 
         if fiat:
             post += f"{tags_fiat}{fiat}"
@@ -132,6 +177,20 @@ class PostMan:
             post += ("\n" if post else "") + f"{tags_gold}{gold}"
         if crypto:
             post += ("\n" if post else "") + f"{tags_crypto}{crypto}"
+        return post
+
+    def create_channel_post(self, channel: Channel, rendered_bodies: Dict[tuple, str] | None = None):
+        """Construct channel post; rendered_bodies is a render key => body memo, valid as long as the prices are not changed.
+        So the body is rendered once, and each channel only adds its own header, footnote and date tag."""
+        key = PostMan.channelRenderKey(channel)
+        if rendered_bodies is not None and key in rendered_bodies:
+            self.channel_post_reuses += 1
+            post = rendered_bodies[key]
+        else:
+            self.channel_post_renders += 1
+            post = self.create_channel_post_body(*key)
+            if rendered_bodies is not None:
+                rendered_bodies[key] = post
 
         return PostMan.customizePost(post, channel, channel.language)
 
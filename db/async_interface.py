@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable
+from decouple import config
+import asyncio
+from db.interface import DatabaseInterface
+
+
+class AsyncDatabaseInterface:
+    """Awaitable facade of DatabaseInterface: each of its methods is available here by the same name, and runs on a
+    bounded thread pool, so queries do not block the event loop. The sync DatabaseInterface stays usable as before."""
+
+    _instance = None
+
+    def __init__(self, interface: DatabaseInterface, pool_size: int = 4) -> None:
+        self.interface = interface
+        # each worker holds at most one pooled connection; keep one connection free for the remaining sync callers
+        self.pool_size = max(1, min(pool_size, interface.pool_size - 1))
+        self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="database")
+
+        # statistics; all updated on the event loop thread
+        self.calls: int = 0
+        self.failures: int = 0
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        self.total_run: float = 0.0
+
+    @staticmethod
+    def get():
+        if not AsyncDatabaseInterface._instance:
+            AsyncDatabaseInterface._instance = AsyncDatabaseInterface(
+                DatabaseInterface.get(), int(config("DATABASE_EXECUTOR_POOL_SIZE", 4))
+            )
+        return AsyncDatabaseInterface._instance
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.interface, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        async def method(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+
+        method.__name__ = name
+        self.__dict__[name] = method  # so __getattr__ is called once per method
+        return method
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs):
+        """Run any blocking database related callable on the pool and wait for its result."""
+        loop = asyncio.get_running_loop()
+        queued_at = perf_counter()
+
+        def job():
+            started_at = perf_counter()
+            return started_at, func(*args, **kwargs)
+
+        self.calls += 1
+        self.in_flight += 1
+        if self.in_flight > self.max_in_flight:
+            self.max_in_flight = self.in_flight
+        started_at = None
+        try:
+            started_at, result = await loop.run_in_executor(self.executor, job)
+            return result
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            if started_at is not None:
+                wait = started_at - queued_at
+                self.total_wait += wait
+                if wait > self.max_wait:
+                    self.max_wait = wait
+                self.total_run += perf_counter() - started_at
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    @property
+    def report(self) -> str:
+        done = self.calls - self.in_flight - self.failures
+        return (
+            f"DB Executor Pool Size: {self.pool_size}, In Flight: {self.in_flight} (Max: {self.max_in_flight})\n"
+            f"Calls: {self.calls}, Failures: {self.failures}, "
+            f"Avg Wait: {(self.total_wait / done if done else 0) * 1000:.1f}ms, Max Wait: {self.max_wait * 1000:.1f}ms, "
+            f"Avg Run: {(self.total_run / done if done else 0) * 1000:.1f}ms"
+        )
@@ -2,7 +2,7 @@ from mysql.connector import Error, pooling
 from datetime import datetime
 from tools.manuwriter import log, prepare_folder, fwrite_from_scratch
 from tools.mathematix import n_days_later, now_in_minute, tz_today
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 from decouple import config
 from enum import Enum
 import json
@@ -151,6 +151,44 @@ class DatabaseInterface:
                 pass
             return DatabaseInterface.TrashType.NONE
 
+    TABLE_MIGRATIONS = "schema_migrations"
+    MIGRATIONS_COLUMNS = (MIGRATION_VERSION, MIGRATION_DESCRIPTION, MIGRATION_APPLIED_AT) = (
+        "version",
+        "description",
+        "applied_at",
+    )
+
+    # (version, description, ((table, index name, indexed columns), ...)); append new versions at the end.
+    SCHEMA_MIGRATIONS = (
+        (
+            1,
+            "Index alarm lookups by token and by owner",
+            (
+                (TABLE_PRICE_ALARMS, "idx_alarms_token", (PRICE_ALARM_TARGET_TOKEN,)),
+                (TABLE_PRICE_ALARMS, "idx_alarms_chat_id", (PRICE_ALARM_TARGET_CHAT_ID,)),
+            ),
+        ),
+        (
+            2,
+            "Index active planned channels",
+            ((TABLE_CHANNELS, "idx_channels_active_interval", (CHANNEL_IS_ACTIVE, CHANNEL_INTERVAL)),),
+        ),
+        (
+            3,
+            "Index accounts by premium end date, username and mode",
+            (
+                (TABLE_ACCOUNTS, "idx_accounts_plus_end_date", (ACCOUNT_PLUS_END_DATE,)),
+                (TABLE_ACCOUNTS, "idx_accounts_username", (ACCOUNT_USERNAME,)),
+                (TABLE_ACCOUNTS, "idx_accounts_mode", (ACCOUNT_MODE,)),
+            ),
+        ),
+        (
+            4,
+            "Index trash by type and due time",
+            ((TABLE_TRASH, "idx_trash_type_delete_at", (TRASH_TYPE, TRASH_DELETE_AT)),),
+        ),
+    )
+
     TrashTypeOptions = (
         TrashType.NONE,
         TrashType.CHANNEL,
@@ -174,11 +212,127 @@ class DatabaseInterface:
         string = string if string[-1] != ";" else string[:-1]
         return string.split(";")
 
+    @staticmethod
+    def changedColumns(columns: tuple, values: tuple, persisted_values: tuple | None) -> Dict[str, Any] | None:
+        """Columns whose values differ from the persisted ones; None if the row state in database is unknown."""
+        if persisted_values is None:
+            return None
+        return {
+            column: value for column, value, old_value in zip(columns, values, persisted_values) if value != old_value
+        }
+
+    @staticmethod
+    def upsertQuery(table: str, columns: tuple) -> str:
+        """Single statement create-or-update; the first column is the primary key."""
+        updates = ", ".join(f"{column}=new_row.{column}" for column in columns[1:])
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES (%s{', %s' * (len(columns) - 1)}) AS new_row "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+
+    @staticmethod
+    def partialUpdateQuery(table: str, columns: List[str] | Tuple[str, ...], id_column: str) -> str:
+        return f"UPDATE {table} SET {', '.join(f'{column}=%s' for column in columns)} WHERE {id_column}=%s"
+
     def migrate(self):
-        """This method is like a migration thing, after any major update, this must be called to perform any required structural change in db"""
-        return
-        # cursor.execute(f'ALTER TABLE {self.TABLE_ACCOUNTS} ADD {self.ACCOUNT_LAST_INTERACTION} DATE')
-        # connection.commit()
+        """Apply the schema migrations which are not applied yet, in order of their versions.
+        Each applied version is recorded in the migrations table, so it runs only once."""
+        conn = self.connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE_MIGRATIONS} ({self.MIGRATION_VERSION} INTEGER PRIMARY KEY, "
+                + f"{self.MIGRATION_DESCRIPTION} VARCHAR(256), {self.MIGRATION_APPLIED_AT} DATETIME DEFAULT CURRENT_TIMESTAMP)"
+            )
+            cursor.execute(f"SELECT {self.MIGRATION_VERSION} FROM {self.TABLE_MIGRATIONS}")
+            applied_versions = {row[0] for row in cursor.fetchall()}
+            for version, description, indexes in self.SCHEMA_MIGRATIONS:
+                if version in applied_versions:
+                    continue
+                for table, index_name, columns in indexes:
+                    self.add_index(cursor, table, index_name, columns)
+                cursor.execute(
+                    f"INSERT INTO {self.TABLE_MIGRATIONS} ({self.MIGRATION_VERSION}, {self.MIGRATION_DESCRIPTION}) VALUES (%s, %s)",
+                    (version, description),
+                )
+                conn.commit()
+                log(f"Migration #{version} applied: {description}", category_name="INFO")
+        except Error as ex:
+            log("Failed applying database migrations.", ex, category_name="SETUP")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def add_index(self, cursor, table: str, index_name: str, columns: Tuple[str, ...]):
+        """Add an index without locking the table for writes; skipped if an index already starts with the same columns,
+        such as the ones MySQL creates for foreign keys."""
+        cursor.execute(
+            "SELECT index_name, GROUP_CONCAT(column_name ORDER BY seq_in_index) FROM information_schema.statistics "
+            "WHERE table_schema=%s AND table_name=%s GROUP BY index_name",
+            (self.__name, table),
+        )
+        for existing_name, existing_columns in cursor.fetchall():
+            if existing_name == index_name or (existing_columns or "").split(",")[: len(columns)] == list(columns):
+                return
+        cursor.execute(
+            f"ALTER TABLE {table} ADD INDEX {index_name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE"
+        )
+
+    def hot_queries(self) -> List[Tuple[str, str, tuple]]:
+        """Frequently run queries, as (name, query, sample params), which must be able to use an index."""
+        return [
+            (
+                "get_alarms_by_tokens",
+                f"SELECT * FROM {self.TABLE_PRICE_ALARMS} WHERE {self.PRICE_ALARM_TARGET_TOKEN} IN (%s, %s)",
+                ("BTC", "USD"),
+            ),
+            (
+                "get_user_alarms",
+                f"SELECT * FROM {self.TABLE_PRICE_ALARMS} WHERE {self.PRICE_ALARM_TARGET_CHAT_ID}=%s",
+                (1,),
+            ),
+            (
+                "get_all_active_channels",
+                f"SELECT * FROM {self.TABLE_CHANNELS} WHERE {self.CHANNEL_IS_ACTIVE}=1 AND {self.CHANNEL_INTERVAL} > 0",
+                (),
+            ),
+            (
+                "get_premium_accounts",
+                f"SELECT * FROM {self.TABLE_ACCOUNTS} WHERE {self.ACCOUNT_PLUS_END_DATE} > %s",
+                (datetime.now(),),
+            ),
+            (
+                "get_special_accounts(username)",
+                f"SELECT * FROM {self.TABLE_ACCOUNTS} WHERE {self.ACCOUNT_USERNAME}=%s LIMIT 1",
+                ("username",),
+            ),
+            (
+                "get_special_accounts(mode)",
+                f"SELECT * FROM {self.TABLE_ACCOUNTS} WHERE {self.ACCOUNT_MODE}=%s",
+                (1,),
+            ),
+            (
+                "get_messages_passed_their_due",
+                f"SELECT {self.TRASH_ID}, {self.TRASH_OWNER_ID}, {self.TRASH_IDENTIFIER} FROM {self.TABLE_TRASH} WHERE {self.TRASH_TYPE}=%s AND {self.TRASH_DELETE_AT} <= %s",
+                (DatabaseInterface.TrashType.MESSAGE.value, now_in_minute()),
+            ),
+        ]
+
+    def find_full_scans(self) -> List[str]:
+        """EXPLAIN the hot queries and return the ones which can only be run by a full table scan."""
+        conn = self.connection()
+        cursor = conn.cursor(dictionary=True)
+        full_scans = []
+        try:
+            for name, query, params in self.hot_queries():
+                cursor.execute(f"EXPLAIN {query}", params)
+                for step in cursor.fetchall():
+                    if (step.get("type") or "").upper() == "ALL" and not step.get("possible_keys"):
+                        full_scans.append(f"{name}: full scan of {step.get('table')}")
+        finally:
+            cursor.close()
+            conn.close()
+        return full_scans
 
     def connection(self):
         return self.__connection_pool.get_connection()
@@ -324,6 +478,7 @@ class DatabaseInterface:
         finally:
             cursor.close()
             conn.close()
+        self.migrate()
 
     def add_account(self, account):
         if not account:
@@ -372,6 +527,15 @@ class DatabaseInterface:
         )
         return accounts[0] if accounts else None
 
+    def get_accounts_by_ids(self, chat_ids: List[int]):
+        if not chat_ids:
+            return []
+        return self.execute(
+            True,
+            f"SELECT * FROM {self.TABLE_ACCOUNTS} WHERE {self.ACCOUNT_ID} IN ({','.join(['%s'] * len(chat_ids))})",
+            *chat_ids,
+        )
+
     def get_all_accounts(self, by_column: str = ACCOUNT_ID) -> list:
         rows = self.execute(True, f"SELECT ({by_column}) FROM {self.TABLE_ACCOUNTS}")
         return [row[0] for row in rows]  # just return a list of ids
@@ -402,71 +566,82 @@ class DatabaseInterface:
             f"SELECT * FROM {self.TABLE_ACCOUNTS} WHERE {self.ACCOUNT_PLUS_END_DATE} IS NOT NULL",
         )
 
-    def update_account(self, account):
+    @staticmethod
+    def accountValues(account) -> tuple:
+        """Values of account columns, in the order of ACCOUNT_COLUMNS, except the id."""
+        return (
+            account.desired_currencies_as_str,
+            account.desired_cryptos_as_str,
+            account.calc_currencies_as_str,
+            account.calc_cryptos_as_str,
+            account.username,
+            account.firstname,
+            account.join_date,
+            account.last_interaction,
+            account.plus_start_date,
+            account.plus_end_date,
+            account.state.value,
+            account.cache_as_str,
+            account.mode.value,
+            account.language,
+        )
+
+    def write_row(self, query: str, params: tuple, failure_message: str) -> int | None:
+        """Run a single row write query; returns the affected rows count, or None if it failed."""
         conn = self.connection()
         cursor = conn.cursor()
         try:
-            columns_to_set = ", ".join([f"{field}=%s" for field in self.ACCOUNT_COLUMNS[1:]])
-
-            cursor.execute(
-                f"UPDATE {self.TABLE_ACCOUNTS} SET {columns_to_set} WHERE {self.ACCOUNT_ID}=%s",
-                (
-                    account.desired_currencies_as_str,
-                    account.desired_cryptos_as_str,
-                    account.calc_currencies_as_str,
-                    account.calc_cryptos_as_str,
-                    account.username,
-                    account.firstname,
-                    account.join_date,
-                    account.last_interaction,
-                    account.plus_start_date,
-                    account.plus_end_date,
-                    account.state.value,
-                    account.cache_as_str,
-                    account.mode.value,
-                    account.language,
-                    account.chat_id,
-                ),
-            )
-
-            if not cursor.rowcount:
-                cursor.execute(
-                    f"SELECT 1 FROM {self.TABLE_ACCOUNTS} WHERE {self.ACCOUNT_ID}=%s",
-                    (account.chat_id,),
-                )
-                if cursor.fetchone():
-                    return
-                columns: str = ", ".join(self.ACCOUNT_COLUMNS)
-                cursor.execute(
-                    f"INSERT INTO {self.TABLE_ACCOUNTS} ({columns}) VALUES (%s{', %s' * (len(self.ACCOUNT_COLUMNS) - 1)})",
-                    (
-                        account.chat_id,
-                        account.desired_currencies_as_str,
-                        account.desired_cryptos_as_str,
-                        account.calc_currencies_as_str,
-                        account.calc_cryptos_as_str,
-                        account.username,
-                        account.firstname,
-                        account.join_date,
-                        account.last_interaction,
-                        account.plus_start_date,
-                        account.plus_end_date,
-                        account.state.value,
-                        account.cache_as_str,
-                        account.mode.value,
-                        account.language,
-                    ),
-                )
+            cursor.execute(query, params)
             conn.commit()
+            return cursor.rowcount
         except Exception as x:
-            log(
+            log(failure_message, x, category_name="Database.fux")
+        finally:
+            cursor.close()
+            conn.close()
+        return None
+
+    def update_account(self, account) -> bool:
+        """Write only the changed columns of the account; or upsert the whole row if its database state is unknown."""
+        changes = account.changed_columns
+        if changes is None:
+            query = self.upsertQuery(self.TABLE_ACCOUNTS, self.ACCOUNT_COLUMNS)
+            params = (account.chat_id, *self.accountValues(account))
+        elif not changes:
+            return True
+        else:
+            query = self.partialUpdateQuery(self.TABLE_ACCOUNTS, list(changes), self.ACCOUNT_ID)
+            params = (*changes.values(), account.chat_id)
+        return (
+            self.write_row(
+                query,
+                params,
                 f'Failed updating account data:\nchat_id: {account.chat_id}, username: {f"@{account.username}" if account.username else "-"}',
-                x,
-                category_name="Database.fux",
             )
+            is not None
+        )
+
+    def update_accounts(self, rows: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """Write a batch of existing accounts, each row as (chat_id, changed columns); accounts with the same
+        set of changed columns are written by a single executemany."""
+        if not rows:
+            return True
+        batches: Dict[Tuple[str, ...], List[tuple]] = {}
+        for chat_id, changes in rows:
+            batches.setdefault(tuple(changes), []).append((*changes.values(), chat_id))
+        conn = self.connection()
+        cursor = conn.cursor()
+        try:
+            for columns, params in batches.items():
+                cursor.executemany(self.partialUpdateQuery(self.TABLE_ACCOUNTS, columns, self.ACCOUNT_ID), params)
+            conn.commit()
+            return True
+        except Exception as x:
+            log(f"Failed batch updating {len(rows)} accounts", x, category_name="Database.fux")
         finally:
             cursor.close()
             conn.close()
+        return False
 
     def update_account_names(self, account):
         self.execute(
@@ -522,76 +697,53 @@ class DatabaseInterface:
             channel.owner_id,
         )
 
-    def update_channel(self, channel, old_chat_id: int = None):
-        conn = self.connection()
-        cursor = conn.cursor()
-        try:
-            channel_id = old_chat_id or channel.id
-            columns_to_set = ", ".join([f"{field}=%s" for field in self.CHANNELS_COLUMNS])
-            cursor.execute(
-                f"UPDATE {self.TABLE_CHANNELS} SET {columns_to_set} WHERE {self.CHANNEL_ID}=%s",
-                (
-                    channel.id,
-                    channel.name,
-                    channel.title,
-                    channel.interval,
-                    int(channel.is_active),
-                    channel.coins_as_str,
-                    channel.currencies_as_str,
-                    channel.message_header,
-                    channel.message_footnote,
-                    int(channel.message_show_date_tag),
-                    int(channel.message_show_market_tags),
-                    channel.language,
-                    channel.last_post_time,
-                    channel.owner_id,
-                    channel_id,
-                ),
-            )
-
-            if cursor.rowcount:
-                log(
-                    f"Channel with the id of [{channel.id}, {channel.name}] has been RE-planned by: {channel.owner_id}",
-                    category_name="INFO",
-                )
-            elif not old_chat_id:
-                cursor.execute(
-                    f"SELECT 1 FROM {self.TABLE_CHANNELS} WHERE {self.CHANNEL_ID}=%s",
-                    (channel.id,),
-                )
-                if cursor.fetchone():
-                    return
-                columns = ", ".join(self.CHANNELS_COLUMNS)
-                cursor.execute(
-                    f"INSERT INTO {self.TABLE_CHANNELS} ({columns}) VALUES (%s{', %s' * (len(self.CHANNELS_COLUMNS) - 1)})",
-                    (
-                        channel.id,
-                        channel.name,
-                        channel.title,
-                        channel.interval,
-                        int(channel.is_active),
-                        channel.coins_as_str,
-                        channel.currencies_as_str,
-                        channel.message_header,
-                        channel.message_footnote,
-                        int(channel.message_show_date_tag),
-                        int(channel.message_show_market_tags),
-                        channel.language,
-                        channel.last_post_time,
-                        channel.owner_id,
-                    ),
-                )
+    @staticmethod
+    def channelValues(channel) -> tuple:
+        """Values of channel columns, in the order of CHANNELS_COLUMNS."""
+        return (
+            channel.id,
+            channel.name,
+            channel.title,
+            channel.interval,
+            int(channel.is_active),
+            channel.coins_as_str,
+            channel.currencies_as_str,
+            channel.message_header,
+            channel.message_footnote,
+            int(channel.message_show_date_tag),
+            int(channel.message_show_market_tags),
+            channel.language,
+            channel.last_post_time,
+            channel.owner_id,
+        )
 
-            conn.commit()
-        except Exception as x:
+    def update_channel(self, channel, old_chat_id: int = None) -> bool:
+        """Write only the changed columns of the channel; or upsert the whole row if its database state is unknown.
+        old_chat_id is used when the channel id itself has been changed, and then no row is created."""
+        changes = channel.changed_columns
+        if changes is None and not old_chat_id:
+            query = self.upsertQuery(self.TABLE_CHANNELS, self.CHANNELS_COLUMNS)
+            params = self.channelValues(channel)
+        else:
+            if changes is None:
+                changes = dict(zip(self.CHANNELS_COLUMNS, self.channelValues(channel)))
+            if not changes:
+                return True
+            query = self.partialUpdateQuery(self.TABLE_CHANNELS, list(changes), self.CHANNEL_ID)
+            params = (*changes.values(), old_chat_id or channel.persisted_values[0])
+        affected_rows = self.write_row(
+            query,
+            params,
+            f"Failed updating channel:\nChannel id: {channel.id}, username: {channel.name}, old_channel_id: {old_chat_id}",
+        )
+        if affected_rows is None:
+            return False
+        if affected_rows and (changes is not None or affected_rows == 2):  # upsert reports 2 for updating existing row
             log(
-                f"Failed updating channel:\nChannel id: {channel.id}, username: {channel.name}, old_channel_id: {old_chat_id}",
-                x,
-                category_name="Database.fux",
+                f"Channel with the id of [{channel.id}, {channel.name}] has been RE-planned by: {channel.owner_id}",
+                category_name="INFO",
             )
-        finally:
-            cursor.close()
-            conn.close()
+        return True
 
     def get_channel(self, channel_id: int):
         channels = self.execute(
@@ -676,9 +828,12 @@ class DatabaseInterface:
 
         columns = ", ".join(self.GROUPS_COLUMNS)
         query = f"INSERT INTO {self.TABLE_GROUPS} ({columns}) VALUES (%s{', %s' * (len(self.GROUPS_COLUMNS) - 1)})"
-        self.execute(
-            False,
-            query,
+        self.execute(False, query, *self.groupValues(group))
+
+    @staticmethod
+    def groupValues(group) -> tuple:
+        """Values of group columns, in the order of GROUPS_COLUMNS."""
+        return (
             group.id,
             group.name,
             group.title,
@@ -691,64 +846,28 @@ class DatabaseInterface:
             group.owner_id,
         )
 
-    def update_group(self, group, old_chat_id: int = None):
-        conn = self.connection()
-        cursor = conn.cursor()
-        try:
-            group_id = old_chat_id or group.id
-            columns_to_set = ", ".join([f"{field}=%s" for field in self.GROUPS_COLUMNS])
-
-            cursor.execute(
-                f"UPDATE {self.TABLE_GROUPS} SET {columns_to_set} WHERE {self.GROUP_ID}=%s",
-                (
-                    group.id,
-                    group.name,
-                    group.title,
-                    group.coins_as_str,
-                    group.currencies_as_str,
-                    group.message_header,
-                    group.message_footnote,
-                    int(group.message_show_date_tag),
-                    int(group.message_show_market_tags),
-                    group.owner_id,
-                    group_id,
-                ),
-            )
-
-            if not cursor.rowcount and not old_chat_id:
-                cursor.execute(
-                    f"SELECT 1 FROM {self.TABLE_GROUPS} WHERE {self.GROUP_ID}=%s",
-                    (group.id,),
-                )
-                if cursor.fetchone():
-                    return
-                columns: str = ", ".join(self.GROUPS_COLUMNS)
-                cursor.execute(
-                    f"INSERT INTO {self.TABLE_GROUPS} ({columns}) VALUES (%s{', %s' * (len(self.GROUPS_COLUMNS) - 1)})",
-                    (
-                        group.id,
-                        group.name,
-                        group.title,
-                        group.coins_as_str,
-                        group.currencies_as_str,
-                        group.message_header,
-                        group.message_footnote,
-                        int(group.message_show_date_tag),
-                        int(group.message_show_market_tags),
-                        group.owner_id,
-                    ),
-                )
-
-            conn.commit()
-        except Exception as x:
-            log(
+    def update_group(self, group, old_chat_id: int = None) -> bool:
+        """Write only the changed columns of the group; or upsert the whole row if its database state is unknown.
+        old_chat_id is used when the group id itself has been changed, and then no row is created."""
+        changes = group.changed_columns
+        if changes is None and not old_chat_id:
+            query = self.upsertQuery(self.TABLE_GROUPS, self.GROUPS_COLUMNS)
+            params = self.groupValues(group)
+        else:
+            if changes is None:
+                changes = dict(zip(self.GROUPS_COLUMNS, self.groupValues(group)))
+            if not changes:
+                return True
+            query = self.partialUpdateQuery(self.TABLE_GROUPS, list(changes), self.GROUP_ID)
+            params = (*changes.values(), old_chat_id or group.persisted_values[0])
+        return (
+            self.write_row(
+                query,
+                params,
                 f"Failed updating group:\nGroup id: {group.id}, username: {group.name}, old_group_id: {old_chat_id}",
-                x,
-                category_name="Database.fux",
             )
-        finally:
-            cursor.close()
-            conn.close()
+            is not None
+        )
 
     def get_group(self, group_id: int):
         groups = self.execute(
@@ -821,10 +940,10 @@ class DatabaseInterface:
         )
 
     def get_alarms_by_tokens(self, tokens: List[str]):
-        targets = "n".join([f"'{curr}'" for curr in tokens])
         return self.execute(
             True,
-            f"SELECT * FROM {self.TABLE_PRICE_ALARMS} WHERE {self.PRICE_ALARM_TARGET_TOKEN} IN ({targets})",
+            f"SELECT * FROM {self.TABLE_PRICE_ALARMS} WHERE {self.PRICE_ALARM_TARGET_TOKEN} IN ({', '.join(['%s'] * len(tokens))})",
+            *tokens,
         )
 
     def get_user_alarms(self, chat_id: int):
@@ -844,6 +963,16 @@ class DatabaseInterface:
             pass
         return 0
 
+    def get_existing_alarm_ids(self, id_list: List[int]) -> List[int]:
+        if not id_list:
+            return []
+        rows = self.execute(
+            True,
+            f"SELECT {self.PRICE_ALARM_ID} FROM {self.TABLE_PRICE_ALARMS} WHERE {self.PRICE_ALARM_ID} IN ({','.join(['%s'] * len(id_list))})",
+            *id_list,
+        )
+        return [row[0] for row in rows or []]
+
     def delete_alarm(self, alarm_id: int):
         self.execute(
             False,
@@ -1095,6 +1224,7 @@ class DatabaseInterface:
         self.__username = config("DATABASE_USERNAME")
         self.__password = config("DATABASE_PASSWORD")
         self.__name = config("DATABASE_NAME")
+        self.pool_size = pool_size
         self.__connection_pool = pooling.MySQLConnectionPool(
             pool_name="main_pool",
             pool_size=pool_size,
@@ -2,17 +2,20 @@ from decouple import config
 from telegram.error import Forbidden
 
 from db.interface import *
+from db.async_interface import AsyncDatabaseInterface
 from datetime import datetime, date
-from tools.mathematix import tz_today, now_in_minute, from_now_time_diff
+from tools.mathematix import tz_today, from_now_time_diff
 from tools.manuwriter import log
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Set
 from typing_extensions import Self
 from bot.types import SelectionListTypes
 from json import loads as json_parse, dumps as jsonify
 from telegram import Chat, User
 from bot.settings import BotSettings
 import gc
+from time import monotonic
+from collections import OrderedDict
 from api.crypto_service import CryptoCurrencyService
 from api.currency_service import NavasanService
 
@@ -96,21 +99,28 @@ class Account:
     UserModes = (Modes.NORMAL, Modes.ADMIN, Modes.GOD)
 
     _database = None
-    FastMemGarbageCollectionInterval = 5
-    PreviousFastMemGarbageCollectionTime: int = now_in_minute()  # in minutes
-    fastMemInstances: dict = (
-        {}
-    )  # active accounts will cache into this; so there's no need to access database every time
+    _async_database = None
+    _fastmem = None  # active accounts are kept in this; so there's no need to access database every time
     botSettings: BotSettings | None = None
 
+    # write-behind: saves are queued here and written together by flushDirty
+    WriteBehindWindow = float(config("ACCOUNT_WRITE_BEHIND_WINDOW", 3))  # in seconds
+    WriteBehindBatchSize = int(config("ACCOUNT_WRITE_BEHIND_BATCH_SIZE", 100))
+    dirtyAccounts: Dict[int, "Account"] = {}
+    firstDirtyTime: float = 0.0
+    writeBehindStats: Dict[str, int] = {
+        "saves": 0,
+        "coalesced": 0,
+        "flushes": 0,
+        "written": 0,
+        "unchanged": 0,
+        "failures": 0,
+    }
+
     def no_interaction_duration(self):
         diff, _ = from_now_time_diff(self.last_interaction)
         return diff
 
-    def organize_fastmem(self):
-        Account.garbageCollect()
-        Account.fastMemInstances[self.chat_id] = self
-
     def __init__(
         self,
         chat_id: int,
@@ -146,6 +156,7 @@ class Account:
         self.plus_end_date: datetime = plus_end_date
         self.username: str | None = username[1:] if username and (username[0] == "@") else username
         self.firstname: str | None = firstname
+        self.persisted_values: tuple | None = None  # column values as last written/read; None means not in database yet
 
         if self.chat_id != HARDCODE_ADMIN_CHATID:
             self.mode: Account.Modes = mode if isinstance(mode, Account.Modes) else Account.Modes.which(mode)
@@ -153,7 +164,7 @@ class Account:
             self.mode = Account.Modes.GOD
 
         if not no_fastmem:
-            self.organize_fastmem()
+            Account.fastMem().put(self)
 
         if not Account.botSettings:
             Account.botSettings = BotSettings.get()
@@ -198,7 +209,7 @@ class Account:
             password = args[1]
             if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
                 self.mode = Account.Modes.GOD
-                self.save()
+                self.save(sync=True)
             return self.is_god
         return False
 
@@ -210,7 +221,7 @@ class Account:
             password = args[1]
             if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
                 self.mode = Account.Modes.GOD
-                self.save()
+                self.save(sync=True)
             return args[2:] if self.is_god else None
         return None
 
@@ -218,19 +229,29 @@ class Account:
         if not self.is_god:
             raise Forbidden("Non-God users are not allowed to upgrade account mode.")
         target.mode = Account.Modes.ADMIN
-        target.save()
+        target.save(sync=True)
 
     def downgrade_to_normal(self, target: Self):
         if not self.is_god:
             raise Forbidden("Non-God users are not allowed to downgrade account mode.")
         target.mode = Account.Modes.NORMAL
-        target.save()
+        target.save(sync=True)
 
     def upgrade(self, duration_in_days: int):
+        Account.flushDirty()  # so that no queued write overwrites the plan afterwards
         Account.database().upgrade_account(self, duration_in_days)
+        self.share_plan_dates()
 
     def downgrade(self):
+        Account.flushDirty()
         Account.database().downgrade_account(self)
+        self.share_plan_dates()
+
+    def share_plan_dates(self):
+        """Apply the plan dates to the fastmem/queued instance of this account, if it's another object."""
+        for twin in (Account.fastMem().peek(self.chat_id), Account.dirtyAccounts.get(self.chat_id)):
+            if twin is not None and twin is not self:
+                twin.plus_start_date, twin.plus_end_date = self.plus_start_date, self.plus_end_date
 
     @property
     def premium_date(self):
@@ -280,8 +301,35 @@ class Account:
     def is_god(self):
         return self.mode == Account.Modes.GOD
 
-    def save(self):
-        self.database().update_account(self)
+    def mark_persisted(self):
+        self.persisted_values = DatabaseInterface.accountValues(self)
+
+    @property
+    def changed_columns(self) -> Dict[str, any] | None:
+        """Account columns changed since last database read/write; None if the account is not in database yet."""
+        return DatabaseInterface.changedColumns(
+            DatabaseInterface.ACCOUNT_COLUMNS[1:], DatabaseInterface.accountValues(self), self.persisted_values
+        )
+
+    def save(self, sync: bool = False):
+        """Queue the account for the next batch write; sync saves and new accounts are written immediately."""
+        if sync or self.persisted_values is None:
+            Account.dirtyAccounts.pop(self.chat_id, None)
+            if self.database().update_account(self):
+                self.mark_persisted()
+            return self
+
+        Account.writeBehindStats["saves"] += 1
+        if self.chat_id in Account.dirtyAccounts:
+            Account.writeBehindStats["coalesced"] += 1
+        elif not Account.dirtyAccounts:
+            Account.firstDirtyTime = monotonic()
+        Account.dirtyAccounts[self.chat_id] = self
+        if (
+            len(Account.dirtyAccounts) >= Account.WriteBehindBatchSize
+            or monotonic() - Account.firstDirtyTime >= Account.WriteBehindWindow
+        ):
+            Account.flushDirty()
         return self
 
     def match_state_with_selection_type(self):
@@ -332,6 +380,7 @@ class Account:
         if username and (username[0] == "@"):
             username = username[1:]
         if username != self.username:
+            Account.fastMem().rename(self, username)
             self.username = username
             data_changed = True
         if chat.first_name != self.firstname:
@@ -383,6 +432,12 @@ class Account:
             Account._database = DatabaseInterface.get()
         return Account._database
 
+    @staticmethod
+    def asyncDatabase() -> AsyncDatabaseInterface:
+        if Account._async_database is None:
+            Account._async_database = AsyncDatabaseInterface.get()
+        return Account._async_database
+
     @staticmethod
     def extractQueryRowData(row: tuple, no_fastmem: bool = False):
         currs = row[1]
@@ -400,7 +455,7 @@ class Account:
         cache = Account.loadCache(row[-3])
         mode = int(row[-2])
         language = row[-1]
-        return Account(
+        account = Account(
             chat_id=int(row[0]),
             currencies=DatabaseInterface.stringToList(currs),
             cryptos=DatabaseInterface.stringToList(cryptos),
@@ -417,6 +472,8 @@ class Account:
             cache=cache,
             no_fastmem=no_fastmem,
         )
+        account.mark_persisted()
+        return account
 
     @staticmethod
     def get(chat: Chat | User, no_fastmem: bool = False):
@@ -424,13 +481,36 @@ class Account:
         account.name = chat
         return account
 
+    @staticmethod
+    async def getAsync(chat: Chat | User, no_fastmem: bool = False):
+        """Same as Account.get, but the database is accessed off the event loop."""
+        account = await Account.getByIdAsync(chat.id, no_fastmem=no_fastmem)
+        account.name = chat
+        return account
+
+    @staticmethod
+    def getCached(chat_id: int):
+        """Account instance kept in memory, if any; from fastmem, or the write-behind queue."""
+        if account := Account.fastMem().get(chat_id):
+            account.last_interaction = tz_today()
+            return account
+        return Account.dirtyAccounts.get(chat_id)  # evicted from fastmem, but its changes are not written yet
+
+    @staticmethod
+    def createDefault(chat_id: int, no_fastmem: bool = False):
+        return Account(
+            chat_id=chat_id,
+            join_date=tz_today(),
+            calc_cryptos=CryptoCurrencyService.getUserDefaultCryptos(),
+            calc_currencies=NavasanService.getUserDefaultCurrencies(),
+            no_fastmem=no_fastmem,
+        )
+
     @staticmethod
     def getById(chat_id: int, no_fastmem: bool = False, should_create: bool = True):
         if chat_id < 0:
             raise ValueError("Account chat_id must be positive.")
-        if chat_id in Account.fastMemInstances:
-            account: Account = Account.fastMemInstances[chat_id]
-            account.last_interaction = tz_today()
+        if account := Account.getCached(chat_id):
             return account
 
         row = Account.database().get_account(chat_id)
@@ -438,25 +518,60 @@ class Account:
             account = Account.extractQueryRowData(row, no_fastmem=no_fastmem)
             return account
 
-        account = Account(
-            chat_id=chat_id,
-            join_date=tz_today(),
-            calc_cryptos=CryptoCurrencyService.getUserDefaultCryptos(),
-            calc_currencies=NavasanService.getUserDefaultCurrencies(),
-            no_fastmem=no_fastmem or not should_create,
-        )
+        account = Account.createDefault(chat_id, no_fastmem=no_fastmem or not should_create)
         if not should_create:
             return account
         return account.save()
 
+    @staticmethod
+    async def getByIdAsync(chat_id: int, no_fastmem: bool = False, should_create: bool = True):
+        """Same as Account.getById, but the database is accessed off the event loop."""
+        if chat_id < 0:
+            raise ValueError("Account chat_id must be positive.")
+        if account := Account.getCached(chat_id):
+            return account
+
+        row = await Account.asyncDatabase().get_account(chat_id)
+        if account := Account.getCached(chat_id):
+            return account  # loaded by another handler meanwhile
+        if row:
+            return Account.extractQueryRowData(row, no_fastmem=no_fastmem)
+
+        account = Account.createDefault(chat_id, no_fastmem=no_fastmem or not should_create)
+        if should_create and await Account.asyncDatabase().update_account(account):
+            account.mark_persisted()
+        return account
+
+    @staticmethod
+    def getByIds(chat_ids: List[int] | Set[int], no_fastmem: bool = True, fresh: bool = False) -> Dict[int, "Account"]:
+        """Load a batch of existing accounts, using fastmem first and then a single query for the rest.
+        If fresh, fastmem is skipped and all accounts are read from database, except the ones with queued changes."""
+        accounts: Dict[int, Account] = {}
+        missing_ids: List[int] = []
+        fastmem = Account.fastMem()
+        for chat_id in chat_ids:
+            if not fresh and (account := fastmem.get(chat_id)):
+                accounts[chat_id] = account
+            elif chat_id in Account.dirtyAccounts:
+                accounts[chat_id] = Account.dirtyAccounts[chat_id]
+            else:
+                missing_ids.append(chat_id)
+        if missing_ids:
+            for row in Account.database().get_accounts_by_ids(missing_ids):
+                account = Account.extractQueryRowData(row, no_fastmem=no_fastmem)
+                accounts[account.chat_id] = account
+        return accounts
+
     @staticmethod
     def getByUsername(username: str):
         if not username:
             return None
         if username[0] == "@":
             username = username[1:]
+        if account := Account.fastMem().getByUsername(username):
+            return account
         try:
-            return next(account for account in Account.fastMemInstances.values() if account.username == username)
+            return next(account for account in Account.dirtyAccounts.values() if account.username == username)
         except:
             pass
 
@@ -482,8 +597,9 @@ class Account:
     @staticmethod
     def statistics():
         # first save all last interactions:
-        for kid in Account.fastMemInstances:
-            Account.fastMemInstances[kid].save()
+        for account in Account.fastMem().accounts.values():
+            account.save()
+        Account.flushDirty()
         now = tz_today().date()
         today_actives, yesterday_actives, this_week_actives, this_month_actives = 0, 0, 0, 0
 
@@ -545,35 +661,71 @@ class Account:
 
         return admins
 
-    def mayInteract(self):
-        long_time_no_see = (
-            self.no_interaction_duration() >= Account.FastMemGarbageCollectionInterval
-        )  # TODO: Check out unit: Needs to convert to secs?
-        if long_time_no_see:
-            self.save()
-            return False
-        return True
+    @staticmethod
+    def fastMem() -> "AccountCache":
+        if Account._fastmem is None:
+            Account._fastmem = AccountCache(
+                int(config("ACCOUNT_CACHE_CAPACITY", 20000)), float(config("ACCOUNT_CACHE_TTL", 600))
+            )
+        return Account._fastmem
 
     @staticmethod
     def garbageCollect():
-        now = now_in_minute()
-        if now - Account.PreviousFastMemGarbageCollectionTime <= Account.FastMemGarbageCollectionInterval:
-            return
-        Account.PreviousFastMemGarbageCollectionTime = now
-
-        Account.fastMemInstances = {
-            chat_id: account for chat_id, account in Account.fastMemInstances.items() if account.mayInteract()
-        }
-        gc.collect()
+        """Drop the accounts idle more than the fastmem TTL; changed ones are queued for writing first."""
+        Account.fastMem().prune(monotonic())
 
     @staticmethod
     def refreshFastMem():
-        Account.fastMemInstances.clear()
+        Account.fastMem().clear()
         gc.collect()
 
+    @staticmethod
+    def flushDirty(only_if_due: bool = False) -> int:
+        """Write queued account changes by one batch query; returns the number of written accounts.
+        When only_if_due is set, the queue is written only if its oldest save is older than the write-behind window."""
+        if not Account.dirtyAccounts or (
+            only_if_due and monotonic() - Account.firstDirtyTime < Account.WriteBehindWindow
+        ):
+            return 0
+        accounts = list(Account.dirtyAccounts.values())
+        Account.dirtyAccounts = {}
+        stats = Account.writeBehindStats
+        stats["flushes"] += 1
+
+        rows: List[Tuple[Account, tuple, Dict[str, any]]] = []
+        for account in accounts:
+            values = DatabaseInterface.accountValues(account)
+            changes = DatabaseInterface.changedColumns(
+                DatabaseInterface.ACCOUNT_COLUMNS[1:], values, account.persisted_values
+            )
+            if changes:
+                rows.append((account, values, changes))
+        stats["unchanged"] += len(accounts) - len(rows)
+        if not rows:
+            return 0
+        if not Account.database().update_accounts([(account.chat_id, changes) for account, _, changes in rows]):
+            stats["failures"] += 1
+            if not Account.dirtyAccounts:
+                Account.firstDirtyTime = monotonic()
+            for account, *_ in rows:
+                Account.dirtyAccounts.setdefault(account.chat_id, account)  # retry on next flush
+            return 0
+        for account, values, _ in rows:
+            account.persisted_values = values
+        stats["written"] += len(rows)
+        return len(rows)
+
+    @staticmethod
+    def writeBehindReport() -> str:
+        stats = Account.writeBehindStats
+        return (
+            f"Account Saves: {stats['saves']}, Coalesced: {stats['coalesced']}, Queued: {len(Account.dirtyAccounts)}\n"
+            f"Flushes: {stats['flushes']}, Written: {stats['written']}, Unchanged: {stats['unchanged']}, Failures: {stats['failures']}"
+        )
+
     @staticmethod
     def getFast(chat_id: int):
-        return Account.fastMemInstances[chat_id] if chat_id in Account.fastMemInstances else None
+        return Account.fastMem().peek(chat_id)
 
     @staticmethod
     def schedulePostsForRemoval(posts: List[Tuple[int, int, int, int]]):
@@ -624,3 +776,102 @@ class Account:
         from db.sq_interface import DatabaseInterface
 
         return DatabaseInterface.Get().get_all()
+
+
+class AccountCache:
+    """LRU cache of active accounts, bounded by capacity and idle time (TTL), with a username index.
+    Accounts leaving the cache are only queued for writing if they have unsaved changes."""
+
+    def __init__(self, capacity: int = 20000, ttl: float = 600.0) -> None:
+        self.capacity = capacity
+        self.ttl = ttl  # in seconds
+        self.accounts: OrderedDict[int, Account] = OrderedDict()  # least recently used first
+        self.last_access: Dict[int, float] = {}
+        self.usernames: Dict[str, int] = {}
+
+        # statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.dirty_evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def get(self, chat_id: int) -> Account | None:
+        account = self.accounts.get(chat_id)
+        if account is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.accounts.move_to_end(chat_id)
+        self.last_access[chat_id] = monotonic()
+        return account
+
+    def peek(self, chat_id: int) -> Account | None:
+        """Get the cached account, without counting it as an access."""
+        return self.accounts.get(chat_id)
+
+    def getByUsername(self, username: str) -> Account | None:
+        chat_id = self.usernames.get(username)
+        return self.get(chat_id) if chat_id is not None else None
+
+    def put(self, account: Account):
+        now = monotonic()
+        previous = self.accounts.get(account.chat_id)
+        if previous is not None and previous.username and previous.username != account.username:
+            self.usernames.pop(previous.username, None)
+        self.accounts[account.chat_id] = account
+        self.accounts.move_to_end(account.chat_id)
+        self.last_access[account.chat_id] = now
+        if account.username:
+            self.usernames[account.username] = account.chat_id
+        self.prune(now)
+
+    def rename(self, account: Account, new_username: str | None):
+        """Update the username index; call before changing the username of the account."""
+        if account.chat_id not in self.accounts:
+            return
+        if account.username and self.usernames.get(account.username) == account.chat_id:
+            del self.usernames[account.username]
+        if new_username:
+            self.usernames[new_username] = account.chat_id
+
+    def evict(self, chat_id: int) -> Account | None:
+        account = self.accounts.pop(chat_id, None)
+        if account is None:
+            return None
+        del self.last_access[chat_id]
+        if account.username and self.usernames.get(account.username) == chat_id:
+            del self.usernames[account.username]
+        if account.changed_columns != {}:  # None means not written in database at all
+            self.dirty_evictions += 1
+            account.save()
+        return account
+
+    def prune(self, now: float):
+        """Evict least recently used accounts over capacity, and the ones idle more than TTL; as the accounts are in
+        the order of their last access, only the head of the cache is checked."""
+        while len(self.accounts) > self.capacity:
+            self.evict(next(iter(self.accounts)))
+            self.evictions += 1
+        while self.accounts:
+            chat_id = next(iter(self.accounts))
+            if now - self.last_access[chat_id] < self.ttl:
+                break
+            self.evict(chat_id)
+            self.expirations += 1
+
+    def clear(self):
+        while self.accounts:
+            self.evict(next(iter(self.accounts)))
+
+    @property
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        return (
+            f"Account Cache: Size={len(self.accounts)}/{self.capacity}, Hits={self.hits}, Misses={self.misses}, "
+            f"Hit Rate={(self.hits / lookups if lookups else 0) * 100:.1f}%\n"
+            f"Evictions={self.evictions}, Expirations={self.expirations}, Dirty Evictions={self.dirty_evictions}"
+        )
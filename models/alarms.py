@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import List, Dict
+from typing import List, Dict, Tuple, Callable
+from bisect import bisect_left, bisect_right
 from typing_extensions import Self
 from db.interface import DatabaseInterface
 from .account import Account
@@ -9,6 +10,7 @@ from bot.types import MarketOptions
 
 class PriceAlarm:
     _database: DatabaseInterface = None
+    _index = None
 
     @staticmethod
     def database():
@@ -16,6 +18,14 @@ class PriceAlarm:
             PriceAlarm._database = DatabaseInterface.get()
         return PriceAlarm._database
 
+    @staticmethod
+    def index():
+        """The resident alarm index; loaded from database on first use, and kept in sync by alarm create/delete methods.
+        Entries of alarms deleted in other ways are dropped when they trigger, by dropStale."""
+        if PriceAlarm._index is None:
+            PriceAlarm._index = AlarmIndex(PriceAlarm.get())
+        return PriceAlarm._index
+
     class ChangeDirection(Enum):
         EXACT = 0
         UP = 1
@@ -74,7 +84,7 @@ class PriceAlarm:
         self.full_token_name: Dict[str, str] | None = None
         self.owner: Account | None = Account.getFast(
             self.chat_id
-        )  # TODO: Use SQL JOIN and Use it In case fastmem is empty
+        )  # owners of triggered alarms are loaded in batch, by Account.getByIds
 
     def set(self):
         db = self.database()
@@ -83,6 +93,8 @@ class PriceAlarm:
             if rows and len(rows):
                 return
         self.id = db.create_new_alarm(self)
+        if PriceAlarm._index is not None:
+            PriceAlarm._index.add(self)
 
     def __str__(self) -> str:
         return f"Alarm for when {self.token} {self.change_direction} {self.target_price} {self.target_unit}"
@@ -119,22 +131,122 @@ class PriceAlarm:
 
     @staticmethod
     def get(tokens: List[str] | None = None):
-        # FIXME: Use SQL 'JOIN ON' keyword to load group and owner accounts simultaneously.
         rows = PriceAlarm.database().get_alarms_by_tokens(tokens) if tokens else PriceAlarm.database().get_alarms()
         return list(map(PriceAlarm.extractQueryRowData, rows))
 
     def disable(self):
         self.database().delete_alarm(self.id)
+        if PriceAlarm._index is not None:
+            PriceAlarm._index.remove(self.id)
 
     @staticmethod
     def batchDisable(alarms: List[Self]):
         PriceAlarm.database().batch_delete_alarms([alarm.id for alarm in alarms])
+        if PriceAlarm._index is not None:
+            for alarm in alarms:
+                PriceAlarm._index.remove(alarm.id)
+
+    @staticmethod
+    def dropStale(alarms: List[Self]) -> List[Self]:
+        """Remove the alarms which are not in database anymore (deleted by a cascade, or out of this process) from the
+        index; returns the ones still existing."""
+        existing_ids = set(PriceAlarm.database().get_existing_alarm_ids([alarm.id for alarm in alarms]))
+        if PriceAlarm._index is not None:
+            for alarm in alarms:
+                if alarm.id not in existing_ids:
+                    PriceAlarm._index.remove(alarm.id)
+        return [alarm for alarm in alarms if alarm.id in existing_ids]
 
     @staticmethod
     def disableById(alarm_id):
         """Efficient way to disable alarms when there is just an id available"""
         PriceAlarm.database().delete_alarm(alarm_id)
+        if PriceAlarm._index is not None:
+            PriceAlarm._index.remove(alarm_id)
 
     @property
     def change_icon(self) -> str:
         return "🔴" if self.change_direction == PriceAlarm.ChangeDirection.DOWN else "🟢"
+
+
+class AlarmIndex:
+    """Alarms grouped by (market, token, unit), each group holding UP/DOWN/EXACT alarms sorted by their target prices;
+    so finding triggered alarms is a bisection per group, instead of checking every single alarm."""
+
+    class Thresholds:
+        __slots__ = ("prices", "alarms")
+
+        def __init__(self) -> None:
+            self.prices: List[float] = []
+            self.alarms: List[PriceAlarm] = []
+
+        def add(self, alarm: PriceAlarm):
+            position = bisect_right(self.prices, alarm.target_price)
+            self.prices.insert(position, alarm.target_price)
+            self.alarms.insert(position, alarm)
+
+        def remove(self, alarm: PriceAlarm) -> bool:
+            position = bisect_left(self.prices, alarm.target_price)
+            while position < len(self.prices) and self.prices[position] == alarm.target_price:
+                if self.alarms[position].id == alarm.id:
+                    del self.prices[position]
+                    del self.alarms[position]
+                    return True
+                position += 1
+            return False
+
+        def triggered(self, direction: PriceAlarm.ChangeDirection, current_price: float) -> List[PriceAlarm]:
+            match direction:
+                case PriceAlarm.ChangeDirection.UP:
+                    return self.alarms[: bisect_right(self.prices, current_price)]
+                case PriceAlarm.ChangeDirection.DOWN:
+                    return self.alarms[bisect_left(self.prices, current_price) :]
+            return self.alarms[bisect_left(self.prices, current_price) : bisect_right(self.prices, current_price)]
+
+    def __init__(self, alarms: List[PriceAlarm] | None = None) -> None:
+        self.groups: Dict[Tuple[MarketOptions, str, str], Dict[PriceAlarm.ChangeDirection, AlarmIndex.Thresholds]] = {}
+        self.alarms_by_id: Dict[int, PriceAlarm] = {}
+        for alarm in alarms or []:
+            self.add(alarm)
+
+    @staticmethod
+    def keyOf(alarm: PriceAlarm) -> Tuple[MarketOptions, str, str]:
+        return alarm.market, alarm.token, alarm.target_unit
+
+    def add(self, alarm: PriceAlarm):
+        if alarm.id in self.alarms_by_id:
+            return
+        self.alarms_by_id[alarm.id] = alarm
+        directions = self.groups.setdefault(AlarmIndex.keyOf(alarm), {})
+        if alarm.change_direction not in directions:
+            directions[alarm.change_direction] = AlarmIndex.Thresholds()
+        directions[alarm.change_direction].add(alarm)
+
+    def remove(self, alarm_id: int):
+        if not (alarm := self.alarms_by_id.pop(alarm_id, None)):
+            return
+        key = AlarmIndex.keyOf(alarm)
+        directions = self.groups[key]
+        thresholds = directions[alarm.change_direction]
+        thresholds.remove(alarm)
+        if not thresholds.prices:
+            del directions[alarm.change_direction]
+            if not directions:
+                del self.groups[key]
+
+    def triggered(self, price_of: Callable[[MarketOptions, str, str], float | int | None]) -> List[PriceAlarm]:
+        """Find the alarms reached their target price; price_of(market, token, unit) provides current prices.
+        Current price of each triggered alarm is set on it."""
+        result: List[PriceAlarm] = []
+        for (market, token, unit), directions in self.groups.items():
+            current_price = price_of(market, token, unit)
+            if current_price is None:
+                continue
+            for direction, thresholds in directions.items():
+                for alarm in thresholds.triggered(direction, current_price):
+                    alarm.current_price = current_price
+                    result.append(alarm)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.alarms_by_id)
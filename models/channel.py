@@ -2,7 +2,9 @@ from tools import manuwriter
 from db.interface import DatabaseInterface
 from json import dumps as jsonify
 from bot.types import GroupInlineKeyboardButtonTemplate
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from heapq import heappush, heappop
+from itertools import count
 from tools.exceptions import (
     MaxAddedCommunityException,
     UserNotAllowedException,
@@ -83,6 +85,7 @@ class PostInterval(GroupInlineKeyboardButtonTemplate):
 
 class Channel:
     _database: DatabaseInterface = None
+    _queue = None
 
     @staticmethod
     def database():
@@ -90,6 +93,13 @@ class Channel:
             Channel._database = DatabaseInterface.get()
         return Channel._database
 
+    @staticmethod
+    def queue():
+        """Active channels ordered by their next post time; loaded from database once, then kept in sync by channel methods."""
+        if Channel._queue is None:
+            Channel._queue = ChannelQueue(Channel.actives())
+        return Channel._queue
+
     @staticmethod
     def GetHasPlanChannels():
         """return all channel table rows that has interval > 0"""
@@ -147,7 +157,8 @@ class Channel:
         self.language = language
         self.owner: Account | None = owner or Account.getFast(
             self.owner_id
-        )  # TODO: Use SQL JOIN and Use it In case fastmem is empty
+        )  # on posting, owners of due channels are reloaded in batch, by Account.getByIds
+        self.persisted_values: tuple | None = None  # column values as last read/written; None if unknown
 
     def create(self):
         if not self.owner:
@@ -171,6 +182,8 @@ class Channel:
             raise UserNotAllowedException(self.owner_id, "have channels")
 
         db.add_channel(self)
+        if Channel._queue is not None:
+            Channel._queue.put(self)
 
     def plan(self) -> bool:
         if self.interval <= 0:
@@ -178,6 +191,8 @@ class Channel:
 
         self.is_active = True
         Channel.database().set_channel_state(self.id, True)
+        if Channel._queue is not None:
+            Channel._queue.put(self)
         return True
 
     def delete(self) -> bool:
@@ -186,6 +201,8 @@ class Channel:
         except Exception as ex:
             manuwriter.log(f"Cannot remove channel:{self.id}", ex, category_name="Channel")
             return False
+        if Channel._queue is not None:
+            Channel._queue.remove(self.id)
         return True
 
     @staticmethod
@@ -204,12 +221,27 @@ class Channel:
     @staticmethod
     def deleteAllUserChannels(user_id: int):
         Channel.database().delete_all_user_channels(user_id)
+        if Channel._queue is not None:
+            Channel._queue.remove_user_channels(user_id)
 
     def __str__(self) -> str:
         return f"Username:{self.name}\nTitle: {self.title}\nId: {self.id}\nInterval: {self.interval}\nOwner Id: {self.owner_id}"
 
+    def mark_persisted(self):
+        self.persisted_values = DatabaseInterface.channelValues(self)
+
+    @property
+    def changed_columns(self) -> Dict[str, any] | None:
+        """Channel columns changed since last database read/write; None if its database state is unknown."""
+        return DatabaseInterface.changedColumns(
+            DatabaseInterface.CHANNELS_COLUMNS, DatabaseInterface.channelValues(self), self.persisted_values
+        )
+
     def save(self):
-        self.database().update_channel(self)
+        if self.database().update_channel(self):
+            self.mark_persisted()
+        if Channel._queue is not None:
+            Channel._queue.put(self)
         return self
 
     def change(self, new_chat: Chat):
@@ -220,7 +252,11 @@ class Channel:
         self.name = new_chat.username
         self.title = new_chat.title
 
-        Channel.database().update_channel(self, old_chat_id=old_chat_id)
+        if Channel.database().update_channel(self, old_chat_id=old_chat_id):
+            self.mark_persisted()
+        if Channel._queue is not None:
+            Channel._queue.remove(old_chat_id)
+            Channel._queue.put(self)
         return self
 
     def throw_in_trashcan(self):
@@ -306,7 +342,7 @@ class Channel:
 
     @staticmethod
     def extractQueryRowData(row: tuple, owner: Account | None = None):
-        return Channel(
+        channel = Channel(
             channel_id=int(row[0]),
             channel_name=row[1],
             channel_title=row[2],
@@ -323,6 +359,8 @@ class Channel:
             owner_id=int(row[-1]),
             owner=owner,
         )
+        channel.mark_persisted()
+        return channel
 
     @staticmethod
     def getByOwner(owner_chat_id: int, take: int | None = 1):
@@ -365,6 +403,9 @@ class Channel:
     @staticmethod
     def updateUserChannels(user: Account):
         Channel.database().update_user_channels_language(user)
+        if Channel._queue is not None:
+            for channel in Channel._queue.user_channels(user.chat_id):
+                channel.language = user.language
 
     @staticmethod
     def selectActiveChannels(take: int = 10, page: int = 0):
@@ -382,3 +423,64 @@ class Channel:
     @staticmethod
     def getActiveChannelsCount():
         return Channel.database().get_active_channels_count()
+
+
+class ChannelQueue:
+    """Min-heap of active channels by their due minute; stale heap entries (of changed or removed channels)
+    are skipped lazily when they reach the top."""
+
+    def __init__(self, channels: List[Channel] | None = None) -> None:
+        self.heap: List[Tuple[int, int, int]] = []  # (due minute, version, channel id)
+        self.channels: Dict[int, Tuple[Channel, int]] = {}  # channel id => (channel, version)
+        self.versions = count()
+        for channel in channels or []:
+            self.put(channel)
+
+    @staticmethod
+    def dueOf(channel: Channel) -> int:
+        return channel.last_post_time + channel.interval if channel.last_post_time else 0
+
+    def put(self, channel: Channel, due: int | None = None):
+        """Add or replace a channel; inactive channels are removed from queue."""
+        if not channel.is_active or not channel.interval or channel.interval <= 0:
+            self.remove(channel.id)
+            return
+        version = next(self.versions)
+        self.channels[channel.id] = (channel, version)
+        heappush(self.heap, (due if due is not None else ChannelQueue.dueOf(channel), version, channel.id))
+
+    def remove(self, channel_id: int):
+        self.channels.pop(channel_id, None)
+
+    def user_channels(self, owner_id: int) -> List[Channel]:
+        return [channel for channel, _ in self.channels.values() if channel.owner_id == owner_id]
+
+    def remove_user_channels(self, owner_id: int):
+        for channel in self.user_channels(owner_id):
+            self.remove(channel.id)
+
+    def pop_due(self, now: int) -> List[Channel]:
+        """Pop all channels due at minute 'now'; They must be put back by requeue after posting."""
+        due_channels: List[Channel] = []
+        while self.heap and self.heap[0][0] <= now:
+            _, version, channel_id = heappop(self.heap)
+            if channel_id in self.channels and self.channels[channel_id][1] == version:
+                due_channels.append(self.channels[channel_id][0])
+        return due_channels
+
+    def requeue(self, channels: List[Channel], posted_ids: List[int], now: int):
+        """Schedule the popped channels again; the ones not posted are retried on the next minute."""
+        posted_ids = set(posted_ids)
+        for channel in channels:
+            if channel.id not in self.channels:
+                continue  # removed while posting
+            if self.channels[channel.id][0] is not channel:
+                continue  # replaced by an updated version while posting, which is already in queue
+            if channel.id in posted_ids:
+                channel.last_post_time = now
+                self.put(channel)
+            else:
+                self.put(channel, due=now + 1)
+
+    def __len__(self) -> int:
+        return len(self.channels)
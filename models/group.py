@@ -1,6 +1,7 @@
 from tools.mathematix import now_in_minute, from_now_time_diff
 from db.interface import DatabaseInterface
-from typing import Dict, List
+from db.async_interface import AsyncDatabaseInterface
+from typing import Dict, List, Tuple
 from telegram import Chat
 from .account import Account
 from tools.exceptions import (
@@ -12,6 +13,8 @@ from tools.exceptions import (
 from tools.manuwriter import log
 from bot.settings import BotSettings
 import gc
+from time import monotonic
+from decouple import config
 from json import loads as load_json
 from api.crypto_service import CryptoCurrencyService
 from api.currency_service import NavasanService
@@ -19,6 +22,8 @@ from api.currency_service import NavasanService
 
 class Group:
     _database: DatabaseInterface = None
+    _async_database: AsyncDatabaseInterface = None
+    _cache = None
 
     @staticmethod
     def database():
@@ -26,6 +31,25 @@ class Group:
             Group._database = DatabaseInterface.get()
         return Group._database
 
+    @staticmethod
+    def asyncDatabase():
+        if not Group._async_database:
+            Group._async_database = AsyncDatabaseInterface.get()
+        return Group._async_database
+
+    @staticmethod
+    def cache():
+        """Resident groups; kept in sync by group methods, so the group message handler rarely needs the database."""
+        if Group._cache is None:
+            Group._cache = GroupCache(
+                float(config("GROUP_CACHE_TTL", 600)), float(config("GROUP_CACHE_NEGATIVE_TTL", 60))
+            )
+        return Group._cache
+
+    @staticmethod
+    def garbageCollect():
+        Group.cache().prune(monotonic())
+
     def __init__(
         self,
         owner_id: int,
@@ -55,12 +79,27 @@ class Group:
         self.owner: Account | None = owner or Account.getFast(
             self.owner_id
         )  # TODO: Use SQL JOIN and Use it In case fastmem is empty
+        self.persisted_values: tuple | None = None  # column values as last read/written; None if unknown
 
     def __str__(self) -> str:
         return f"Groupname:{self.name}\nId: {self.id}\nOwner Id: {self.owner_id}"
 
+    def mark_persisted(self):
+        self.persisted_values = DatabaseInterface.groupValues(self)
+
+    @property
+    def changed_columns(self) -> Dict[str, any] | None:
+        """Group columns changed since last database read/write; None if its database state is unknown."""
+        return DatabaseInterface.changedColumns(
+            DatabaseInterface.GROUPS_COLUMNS, DatabaseInterface.groupValues(self), self.persisted_values
+        )
+
     def save(self):
-        self.database().update_group(self)
+        if self.database().update_group(self):
+            self.mark_persisted()
+            Group.cache().put(self.id, self)
+        else:
+            Group.cache().remove(self.id)
         return self
 
     def change(self, new_chat: Chat):
@@ -71,7 +110,12 @@ class Group:
         self.name = new_chat.username
         self.title = new_chat.title
 
-        Group.database().update_group(self, old_chat_id=old_chat_id)
+        Group.cache().remove(old_chat_id)
+        if Group.database().update_group(self, old_chat_id=old_chat_id):
+            self.mark_persisted()
+            Group.cache().put(self.id, self)
+        else:
+            Group.cache().remove(self.id)
         return self
 
     def delete(self) -> bool:
@@ -80,11 +124,13 @@ class Group:
         except Exception as ex:
             log(f"Cannot remove Group:{self.id}", ex, category_name="Group")
             return False
+        Group.cache().remove(self.id)
         return True
 
     @staticmethod
     def deleteAllUserGroups(user_id: int):
         Group.database().delete_all_user_groups(user_id)
+        Group.cache().remove_owner_groups(user_id)
 
     def throw_in_trashcan(self):
         self.database().trash_sth(self.owner_id, DatabaseInterface.TrashType.GROUP, self.id, self.as_dict)
@@ -164,15 +210,28 @@ class Group:
     @staticmethod
     def get(group_id):
         # FIXME: Use SQL 'JOIN ON' keyword to load group and owner accounts simultaneously.
+        found, group = Group.cache().lookup(group_id)
+        if found:
+            return group
         row = Group.database().get_group(group_id)
-        if row:
-            return Group.extractQueryRowData(row)
+        group = Group.extractQueryRowData(row) if row else None
+        Group.cache().put(group_id, group)
+        return group
 
-        return None
+    @staticmethod
+    async def getAsync(group_id):
+        """Same as Group.get, but the database is accessed off the event loop."""
+        found, group = Group.cache().lookup(group_id)
+        if found:
+            return group
+        row = await Group.asyncDatabase().get_group(group_id)
+        group = Group.extractQueryRowData(row) if row else None
+        Group.cache().put(group_id, group)
+        return group
 
     @staticmethod
     def extractQueryRowData(row: tuple, owner: Account | None = None):
-        return Group(
+        group = Group(
             group_id=int(row[0]),
             group_name=row[1],
             group_title=row[2],
@@ -185,6 +244,8 @@ class Group:
             owner_id=int(row[-1]),
             owner=owner,
         )
+        group.mark_persisted()
+        return group
 
     @staticmethod
     def getByOwner(owner_chat_id: int, take: int | None = 1):
@@ -209,7 +270,7 @@ class Group:
             group.name = chat.username
             group.title = chat.title
             group.owner_id = owner_id
-            group.save()
+            group.save()  # also caches it
             return group
 
         # enhanced check:
@@ -233,6 +294,8 @@ class Group:
             selected_currencies=NavasanService.getUserDefaultCurrencies(),
         )
         db.add_group(group)
+        group.mark_persisted()
+        Group.cache().put(group.id, group)
         return group
 
     @staticmethod
@@ -274,3 +337,49 @@ class Group:
     @staticmethod
     def getAllGroupsCount():
         return Group.database().get_all_groups_count()
+
+
+class GroupCache:
+    """Groups by their id, each kept for a TTL; chats which are not registered groups are remembered too (as None),
+    for a shorter TTL, so messages of unknown groups don't query the database either."""
+
+    def __init__(self, ttl: float = 600.0, negative_ttl: float = 60.0) -> None:
+        self.ttl = ttl  # in seconds
+        self.negative_ttl = negative_ttl
+        self.groups: Dict[int, Tuple[Group | None, float]] = {}  # group id => (group or None, expiry time)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def lookup(self, group_id: int) -> Tuple[bool, Group | None]:
+        """Returns (found, group); group is None for a known non-registered chat."""
+        entry = self.groups.get(group_id)
+        if entry is None or entry[1] <= monotonic():
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, group_id: int, group: Group | None):
+        self.groups[group_id] = (group, monotonic() + (self.ttl if group else self.negative_ttl))
+
+    def remove(self, group_id: int):
+        self.groups.pop(group_id, None)
+
+    def remove_owner_groups(self, owner_id: int):
+        owned_group_ids = [
+            group_id for group_id, (group, _) in self.groups.items() if group and group.owner_id == owner_id
+        ]
+        for group_id in owned_group_ids:
+            del self.groups[group_id]
+
+    def prune(self, now: float):
+        for group_id in [group_id for group_id, (_, expiry) in self.groups.items() if expiry <= now]:
+            del self.groups[group_id]
+
+    @property
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        return (
+            f"Group Cache: Size={len(self.groups)}, Hits={self.hits}, Misses={self.misses}, "
+            f"Hit Rate={(self.hits / lookups if lookups else 0) * 100:.1f}%"
+        )
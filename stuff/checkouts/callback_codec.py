@@ -0,0 +1,31 @@
+from json import dumps, loads
+from timeit import timeit
+from bot.callbacks import CallbackData
+
+# compare the compact callback data codec with the json payloads, for a full page of token choice buttons
+symbols = [f"TOKEN{i}" for i in range(90)]
+rounds = 1000
+
+
+def json_page():
+    return [dumps({"lt": 1, "bt": 1, "pg": 0, "v": symbol}) for symbol in symbols]
+
+
+def compact_page():
+    return [CallbackData.choice(1, 1, symbol, 0) for symbol in symbols]
+
+
+json_payloads, compact_payloads = json_page(), compact_page()
+assert [loads(payload) for payload in json_payloads] == [CallbackData.decode(payload) for payload in compact_payloads]
+assert [CallbackData.decode(payload) for payload in json_payloads] == [loads(payload) for payload in json_payloads]
+
+print("build page, json = ", timeit(json_page, number=rounds) / rounds * 1e6, "us")
+print("build page, compact = ", timeit(compact_page, number=rounds) / rounds * 1e6, "us")
+print("decode, json = ", timeit(lambda: loads(json_payloads[0]), number=rounds * 100) / rounds * 1e4, "us")
+print(
+    "decode, compact = ",
+    timeit(lambda: CallbackData.decode(compact_payloads[0]), number=rounds * 100) / rounds * 1e4,
+    "us",
+)
+print("payload size, json = ", len(json_payloads[0].encode()), "bytes")
+print("payload size, compact = ", len(compact_payloads[0].encode()), "bytes")
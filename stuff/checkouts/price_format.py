@@ -0,0 +1,24 @@
+from random import uniform
+from timeit import timeit
+from tools.mathematix import cut, separate_by3, cut_and_separate, cut_and_separate_many, persianify
+
+# throughput of the price formatter against the older cut + separate_by3 path, over a mix of price magnitudes
+prices = [10 ** uniform(-8, 7) for _ in range(10000)] + [float(i) for i in range(0, 100000, 10)]
+
+assert [separate_by3(*cut(price)) for price in prices] == cut_and_separate_many(prices)
+
+old_time = timeit(lambda: [separate_by3(*cut(price)) for price in prices], number=10)
+new_time = timeit(lambda: cut_and_separate_many(prices), number=10)
+print("cut + separate_by3 = ", len(prices) * 10 / old_time, "prices/s")
+print("cut_and_separate = ", len(prices) * 10 / new_time, "prices/s")
+
+formatted = cut_and_separate_many(prices)
+persian_time = timeit(lambda: [persianify(x) for x in formatted], number=10)
+print("persianify = ", len(prices) * 10 / persian_time, "prices/s")
+try:
+    from persiantools import digits
+
+    en_to_fa_time = timeit(lambda: [digits.en_to_fa(x) for x in formatted], number=10)
+    print("persiantools en_to_fa = ", len(prices) * 10 / en_to_fa_time, "prices/s")
+except ImportError:
+    pass
@@ -0,0 +1,35 @@
+from tempfile import TemporaryDirectory
+from api.price_history import PriceHistory
+
+# focused checks of the price history: in-memory ring trim, segment rotation bound & loading a torn segment
+with TemporaryDirectory() as folder:
+    history = PriceHistory("check", folder, capacity=3, segment_seconds=10, max_segments=2, load_segments=0)
+
+    # between capacity and twice the capacity points are kept in memory
+    for i in range(6):
+        history.append("BTC", float(i), float(i))
+    assert len(history.series["BTC"].times) == 6
+    history.append("BTC", 6.0, 6.0)
+    assert list(history.series["BTC"].times) == [4.0, 5.0, 6.0]
+    assert history.last("BTC", 2) == [(5.0, 5.0), (6.0, 6.0)]
+    history.append("BTC", 1.0, 1.0)  # out of order points are ignored
+    assert history.last("BTC") == [(6.0, 6.0)]
+
+    # one segment per segment_seconds, and only the latest max_segments are kept
+    for i, timestamp in enumerate((100.0, 105.0, 110.0, 120.0, 130.0)):
+        assert history.record({"ETH": 1000.0 + i, "A_TOO_LONG_SYMBOL_NAME": 1.0}, version=i, timestamp=timestamp)
+    assert not history.record({"ETH": 0.0}, version=4, timestamp=140.0)  # already recorded snapshot
+    history.shutdown()
+    assert [start for start, _ in history.segments()] == [120, 130]
+    assert history.removed_segments == 2 and history.failures == 0
+    assert history.unpersisted_symbols == {"A_TOO_LONG_SYMBOL_NAME"}
+
+    # an incomplete record at the end of the last segment is skipped on load
+    with open(history.segments()[-1][1], "ab") as segment_file:
+        segment_file.write(PriceHistory.RECORD.pack(b"ETH", 131.0, 2000.0)[:-5])
+    loaded = PriceHistory("check", folder, capacity=3, segment_seconds=10, max_segments=2, load_segments=2)
+    assert loaded.last("ETH", 10) == [(120.0, 1003.0), (130.0, 1004.0)]
+    assert "A_TOO_LONG_SYMBOL_NAME" not in loaded.series
+    loaded.shutdown()
+
+print("price history checks passed.")
@@ -0,0 +1,9 @@
+from db.interface import DatabaseInterface
+import sys
+
+# EXPLAIN the hot queries; exits with failure when any of them can only be run by a full table scan.
+full_scans = DatabaseInterface.get().find_full_scans()
+for full_scan in full_scans:
+    print(full_scan)
+print(f"{len(full_scans)} hot queries doing full table scans." if full_scans else "All hot queries can use an index.")
+sys.exit(1 if full_scans else 0)
@@ -68,11 +68,19 @@ def log(msg, exception: Exception = None, category_name=None):
 
 
 def fwrite_from_scratch(fpath: str, fdata: str, source: str = None) -> bool:
+    # written into a temp file first and then renamed, so a crash while writing never leaves a truncated file
+    temp_path = f"{fpath}.tmp"
     try:
-        f = open(fpath, "w")
-        f.write(fdata)
-        f.close()
+        with open(temp_path, "w") as f:
+            f.write(fdata)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, fpath)
     except Exception as ex:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
         data_trunc = fdata[:20] if len(fdata) > 20 else fdata
         log(f"File write failure; filename: {fpath}, data: {data_trunc}", ex, source)
         return False
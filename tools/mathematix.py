@@ -1,9 +1,8 @@
 from datetime import datetime
 import pytz
-from persiantools import digits
 from dateutil.relativedelta import relativedelta
 from time import time
-from typing import Tuple
+from typing import Iterable, List, Tuple
 
 
 timezone = pytz.timezone("Asia/Tehran")
@@ -56,16 +55,48 @@ def cut(number: float | int, return_string: bool = False):
     return strnum[: end + 1] if return_string else float(strnum[: end + 1]), end - dot_index
 
 
+PERSIAN_DIGITS = str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹")
+
+
 def persianify(number: str | float | int):
     if not isinstance(number, str):
         number = str(number)
-    return digits.en_to_fa(number)  # .replace('.', '/').replace(',', '،')
+    return number.translate(PERSIAN_DIGITS)  # .replace('.', '/').replace(',', '،')
 
 
 def cut_and_separate(num: float | int):
-    num, precision = cut(num)
+    """Same output as separate_by3(*cut(num)); the kept digits are sliced from the number string directly,
+    since the integer part of any number with decimals here is below 1000 and needs no separators."""
+    if not num:
+        return "0"
+    if num < 0:
+        return separate_by3(*cut(num))
+    intnum = int(num)
+    if intnum == num or intnum >= 1000:
+        return f"{intnum:,}"
+
+    strnum = str(num)
+    if "e" in strnum:
+        strnum = f"{num:.16f}"
+    dot_index = strnum.find(".")
+    if dot_index < 0:
+        return strnum
+
+    if num >= 1:  # two digits after . for numbers above 10, four digits for the rest
+        end = dot_index + (3 if num >= 10 else 5)
+        return strnum[:end] if strnum[dot_index + 1 : end].strip("0") else str(intnum)
+
+    # num < 1 => write till 4 digits after the first zero after .
+    significant = strnum[dot_index + 1 :].lstrip("0")
+    if not significant:
+        return str(intnum)
+    return strnum[: len(strnum) - len(significant)] + significant[:4].rstrip("0")
+
 
-    return separate_by3(num, precision)
+def cut_and_separate_many(numbers: Iterable[float | int], persian: bool = False) -> List[str]:
+    if persian:
+        return [cut_and_separate(number).translate(PERSIAN_DIGITS) for number in numbers]
+    return [cut_and_separate(number) for number in numbers]
 
 
 def tz_today() -> datetime:  # today date in a specific timezone
@@ -84,8 +115,8 @@ def timestamp(language: str = "fa") -> str:
     try:
         year, month, day = gregorian_to_jalali(now.year, now.month, now.day)
         weekday = WEEKDAYS[now.weekday()]
-        date = digits.en_to_fa(f"{year}/{month:02d}/{day:02d}")
-        time = digits.en_to_fa(now.strftime("%H:%M"))
+        date = persianify(f"{year}/{month:02d}/{day:02d}")
+        time = persianify(now.strftime("%H:%M"))
         return f"📆 {date} {weekday} {time}"
 
     except Exception as ex:
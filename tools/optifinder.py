@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple, Any
 
 
 class OptiFinder:
@@ -24,3 +24,62 @@ class OptiFinder:
                     multiword_candidate = slug
 
         return multiword_candidate, multiword_max_count
+
+
+class SymbolTrie:
+    """Prebuilt word-level trie over several symbol-name tables, giving the same results as chained
+    OptiFinder.search_around calls, without scanning every table entry for each word of the text.
+    sources are (table, check_slug, tag) tuples in priority order; tag is returned with each match.
+    version is the version of the name tables the trie is built from; the owner bumps it whenever a table is changed."""
+
+    class Node:
+        __slots__ = ("children", "terminals")
+
+        def __init__(self) -> None:
+            self.children: Dict[str, "SymbolTrie.Node"] = {}
+            self.terminals: Dict[int, str] = {}  # source index => slug
+
+    def __init__(self, sources: List[Tuple[Dict[str, str] | None, bool, Any]], version: int = 0) -> None:
+        self.version = version
+        self.tags = [tag for _, _, tag in sources]
+        self.singles: List[Dict[str, str]] = []
+        self.root = SymbolTrie.Node()
+
+        for source_index, (table, check_slug, _) in enumerate(sources):
+            singles = {}
+            for slug, name in (table or {}).items():
+                # setdefault keeps the first slug in table order, as search_around does
+                singles.setdefault(name, slug)
+                if check_slug:
+                    singles.setdefault(slug, slug)
+                name_words = name.split()
+                if len(name_words) > 1:
+                    node = self.root
+                    for word in name_words:
+                        if word not in node.children:
+                            node.children[word] = SymbolTrie.Node()
+                        node = node.children[word]
+                    node.terminals.setdefault(source_index, slug)
+            self.singles.append(singles)
+
+    def is_outdated(self, version: int) -> bool:
+        """True if the name tables have been changed since this trie was built."""
+        return self.version != version
+
+    def search(self, words: List[str], index: int = 0) -> Tuple[str | None, int, Any]:
+        """Find the symbol starting at words[index]; returns (slug, word_count, tag), or (None, 1, None) if nothing matched."""
+        longest_matches: Dict[int, Tuple[str, int]] = {}
+        node, next_index, words_count = self.root, index, len(words)
+        while next_index < words_count and (node := node.children.get(words[next_index])):
+            next_index += 1
+            for source_index, slug in node.terminals.items():
+                longest_matches[source_index] = (slug, next_index - index)
+
+        word = words[index].upper()
+        for source_index, singles in enumerate(self.singles):
+            if word in singles:
+                return singles[word], 1, self.tags[source_index]
+            if source_index in longest_matches:
+                slug, word_count = longest_matches[source_index]
+                return slug, word_count, self.tags[source_index]
+        return None, 1, None